@@ -0,0 +1,186 @@
+import operator
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from models import AlertRule, AlertState, EnvironmentReading
+from app import db
+
+OPERATORS = {">": operator.gt, "<": operator.lt}
+
+# History loaded beyond the longest rule window, so the reading in effect at its start is known
+WINDOW_SLACK = timedelta(minutes=5)
+
+
+class _Series:
+    """
+    Readings of one metric at one location, oldest first, with suffix minima and maxima:
+    `suffix_min[i]` is the smallest value from reading i to the latest one. Any rule window
+    ending at the latest reading is then answered with one bisect and one lookup.
+    """
+    def __init__(self, times, values):
+        self.times = times
+        self.values = values
+        self.suffix_min = list(accumulate(reversed(values), min))[::-1]
+        self.suffix_max = list(accumulate(reversed(values), max))[::-1]
+
+    def window_start(self, since):
+        # Index of the reading in effect at `since`, i.e. the last one at or before it
+        index = bisect_right(self.times, since) - 1
+        return index if index >= 0 else None
+
+
+def _breached(rule, series, now):
+    """
+    Whether the rule's condition held at every reading during its duration.
+    """
+    if not rule.duration:
+        return OPERATORS[rule.operator](series.values[-1], rule.threshold)
+    start = series.window_start(now - timedelta(seconds=rule.duration))
+    if start is None:
+        # Not enough history to tell whether the breach was sustained
+        return False
+    if rule.operator == ">":
+        return series.suffix_min[start] > rule.threshold
+    return series.suffix_max[start] < rule.threshold
+
+
+def _cleared(rule, value):
+    clear_threshold = rule.threshold if rule.clear_threshold is None else rule.clear_threshold
+    if rule.operator == ">":
+        return value < clear_threshold
+    return value > clear_threshold
+
+
+def evaluate_rules(now=None, slack=WINDOW_SLACK):
+    """
+    Evaluate every enabled rule against the stored readings and update AlertState, inside
+    the caller's transaction. Readings for all locations are loaded with one query and each
+    (location, metric) series is scanned once, however many rules share it. Alerts at
+    locations with no readings in the window are cleared, as their condition is unknown.
+    `slack` should exceed the polling interval. Returns the number of active alerts.
+    """
+    now = now or datetime.utcnow()
+    rules = AlertRule.query.filter(AlertRule.enabled.is_(True)).all()
+    if not rules:
+        return 0
+
+    longest = timedelta(seconds=max(rule.duration for rule in rules)) + slack
+    readings = db.session.query(
+        EnvironmentReading.location,
+        EnvironmentReading.recorded_at,
+        EnvironmentReading.temperature,
+        EnvironmentReading.humidity,
+        EnvironmentReading.wind_speed,
+        EnvironmentReading.visibility,
+    ).filter(
+        EnvironmentReading.recorded_at >= now - longest,
+        EnvironmentReading.recorded_at <= now,
+    ).order_by(EnvironmentReading.location, EnvironmentReading.recorded_at).all()
+
+    by_location = defaultdict(list)
+    for reading in readings:
+        by_location[reading.location].append(reading)
+
+    series = {}
+    metrics = {rule.metric for rule in rules}
+    for location, rows in by_location.items():
+        times = [row.recorded_at for row in rows]
+        for metric in metrics:
+            series[location, metric] = _Series(times, [getattr(row, metric) for row in rows])
+
+    states = {(state.rule_id, state.location): state for state in AlertState.query.all()}
+    active = 0
+    for rule in rules:
+        locations = [rule.location] if rule.location else list(by_location)
+        for location in locations:
+            metric_series = series.get((location, rule.metric))
+            if metric_series is None:
+                _clear_stale(states.get((rule.id, location)))
+                continue
+            value = metric_series.values[-1]
+            state = states.get((rule.id, location))
+            if state is None:
+                state = AlertState(rule_id=rule.id, location=location, active=False)
+                db.session.add(state)
+
+            if state.active:
+                if _cleared(rule, value):
+                    state.active = False
+                    state.since = None
+            elif _breached(rule, metric_series, now):
+                state.active = True
+                state.since = now
+            state.value = value
+            state.evaluated_at = now
+            active += state.active
+        if not rule.location:
+            # Locations that reported before but have no readings in this window
+            for (rule_id, location), state in states.items():
+                if rule_id == rule.id and location not in by_location:
+                    _clear_stale(state)
+    return active
+
+
+def _clear_stale(state):
+    # Left with its old evaluated_at, so readers can tell the location went quiet
+    if state is not None and state.active:
+        state.active = False
+        state.since = None
+
+
+def has_fresh_evaluation(max_age, now=None):
+    """
+    Whether the alert rules were evaluated within the last `max_age`. Also true when no rule
+    is enabled, as there is then nothing to evaluate.
+    """
+    now = now or datetime.utcnow()
+    if not db.session.query(AlertRule.query.filter(AlertRule.enabled.is_(True)).exists()).scalar():
+        return True
+    latest = db.session.query(db.func.max(AlertState.evaluated_at)).scalar()
+    return latest is not None and latest >= now - max_age
+
+
+def evaluate_reading(conditions, location):
+    """
+    Messages of the enabled rules that `conditions`, a single current reading at `location`,
+    breaches. Without stored history a rule's duration and clear threshold cannot be applied,
+    so each rule is checked against its threshold alone. Nothing is written.
+    """
+    rules = AlertRule.query.filter(
+        AlertRule.enabled.is_(True),
+        db.or_(AlertRule.location.is_(None), AlertRule.location == location),
+    ).order_by(AlertRule.id).all()
+    return [
+        rule.message.format(value=conditions[rule.metric], location=location)
+        for rule in rules
+        if OPERATORS[rule.operator](conditions[rule.metric], rule.threshold)
+    ]
+
+
+def active_alerts(max_age, now=None):
+    """
+    Active alerts evaluated within the last `max_age`, as dicts ready for the alert schemas.
+    """
+    now = now or datetime.utcnow()
+    rows = db.session.query(AlertState, AlertRule).join(
+        AlertRule, AlertRule.id == AlertState.rule_id
+    ).filter(
+        AlertState.active.is_(True),
+        AlertState.evaluated_at >= now - max_age,
+        AlertRule.enabled.is_(True),
+    ).order_by(AlertState.since, AlertRule.id).all()
+    return [
+        {
+            "rule_id": rule.id,
+            "name": rule.name,
+            "location": state.location,
+            "metric": rule.metric,
+            "value": state.value,
+            "since": state.since,
+            "evaluated_at": state.evaluated_at,
+            "message": rule.message.format(value=state.value, location=state.location),
+        }
+        for state, rule in rows
+    ]
@@ -0,0 +1,54 @@
+import functools
+import json
+import os
+import threading
+
+from flask import Response
+from flask_apispec import FlaskApiSpec
+
+
+class LazyFlaskApiSpec(FlaskApiSpec):
+    """
+    FlaskApiSpec that records register() calls and only converts them into the
+    OpenAPI document when it is first needed, instead of at import time.
+
+    If APISPEC_CACHE_FILE names an existing file (see `flask openapi`), its JSON is
+    served as-is and the spec is never built in the worker.
+    """
+    def __init__(self, app=None, document_options=True):
+        self._pending = []
+        self._build_lock = threading.Lock()
+        self._spec_json = None
+        super().__init__(app, document_options)
+
+    def register(self, target, endpoint=None, blueprint=None,
+                 resource_class_args=None, resource_class_kwargs=None):
+        self._pending.append(functools.partial(
+            self._register, target, endpoint, blueprint, resource_class_args, resource_class_kwargs,
+        ))
+
+    def build(self):
+        """
+        Convert every pending registration and return the spec as a dict.
+        """
+        with self._build_lock:
+            while self._pending:
+                self._pending.pop(0)()
+            return self.spec.to_dict()
+
+    def swagger_json(self):
+        if self._spec_json is None:
+            cache_file = self.app.config.get('APISPEC_CACHE_FILE')
+            if cache_file and os.path.exists(cache_file):
+                with open(cache_file) as f:
+                    self._spec_json = f.read()
+            else:
+                self._spec_json = json.dumps(self.build())
+        return Response(self._spec_json, mimetype="application/json")
+
+    def write(self, path):
+        """
+        Build the spec and write it to `path`, for serving through APISPEC_CACHE_FILE.
+        """
+        with open(path, "w") as f:
+            json.dump(self.build(), f, indent=2, sort_keys=True)
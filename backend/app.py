@@ -1,12 +1,15 @@
+import click
 from apispec import APISpec
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
-from flasgger import Swagger
 from dotenv import load_dotenv
-from flask_apispec import FlaskApiSpec
 from apispec.ext.marshmallow import MarshmallowPlugin
+from engine_profile import engine_options, install_sqlite_pragmas, is_sqlite
+from metrics import init_metrics
+from compression import init_compression
+from apidocs import LazyFlaskApiSpec
 import os
 
 # Load environment variables
@@ -17,13 +20,52 @@ app = Flask(__name__)
 # Configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///port.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'supersecretkey')
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv('PASSWORD_HASH_QUEUE', 32))
+app.config['PASSWORD_HASH_WAIT'] = float(os.getenv('PASSWORD_HASH_WAIT', 2))
+app.config['ROLE_CACHE_TTL'] = float(os.getenv('ROLE_CACHE_TTL', 30))
+app.config['SERVICE_CATALOG_TTL'] = float(os.getenv('SERVICE_CATALOG_TTL', 300))
+app.config['CARGO_STATUS_COUNTERS'] = os.getenv('CARGO_STATUS_COUNTERS', 'true').lower() in ('1', 'true', 'yes')
+app.config['CARGO_BULK_CHUNK_SIZE'] = int(os.getenv('CARGO_BULK_CHUNK_SIZE', 1000))
+app.config['CARGO_LOOKUP_MAX_BATCH'] = int(os.getenv('CARGO_LOOKUP_MAX_BATCH', 500))
+# Queue PATCH /cargo/status updates and write only the latest status per cargo every flush interval
+app.config['CARGO_STATUS_WRITE_BEHIND'] = os.getenv('CARGO_STATUS_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+app.config['CARGO_STATUS_FLUSH_INTERVAL'] = float(os.getenv('CARGO_STATUS_FLUSH_INTERVAL', 0.5))
+app.config['CARGO_STATUS_BUFFER_MAX'] = int(os.getenv('CARGO_STATUS_BUFFER_MAX', 100000))
+app.config['CARGO_STATUS_FLUSH_ATTEMPTS'] = int(os.getenv('CARGO_STATUS_FLUSH_ATTEMPTS', 5))
+# Serve list endpoints from projected rows encoded straight to JSON, bypassing ORM objects and marshmallow
+app.config['FAST_SERIALIZATION'] = os.getenv('FAST_SERIALIZATION', 'true').lower() in ('1', 'true', 'yes')
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip, 1-9
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))  # brotli, 0-11
+app.config['ENVIRONMENT_POLLER'] = os.getenv('ENVIRONMENT_POLLER', 'false').lower() in ('1', 'true', 'yes')
+app.config['ENVIRONMENT_POLL_INTERVAL'] = float(os.getenv('ENVIRONMENT_POLL_INTERVAL', 60))
+app.config['ENVIRONMENT_POLL_LOCATIONS'] = [
+    location.strip() for location in os.getenv('ENVIRONMENT_POLL_LOCATIONS', os.getenv('WEATHER_LOCATION', 'Port La Goulette')).split(';') if location.strip()
+]
+app.config['ENVIRONMENT_RAW_RETENTION_DAYS'] = int(os.getenv('ENVIRONMENT_RAW_RETENTION_DAYS', 7))
+app.config['ENVIRONMENT_MINUTE_RETENTION_DAYS'] = int(os.getenv('ENVIRONMENT_MINUTE_RETENTION_DAYS', 7))
+app.config['ENVIRONMENT_HOUR_RETENTION_DAYS'] = int(os.getenv('ENVIRONMENT_HOUR_RETENTION_DAYS', 365))
+app.config['ENVIRONMENT_DAY_RETENTION_DAYS'] = int(os.getenv('ENVIRONMENT_DAY_RETENTION_DAYS', 0))
+app.config['ENVIRONMENT_HISTORY_MAX_POINTS'] = int(os.getenv('ENVIRONMENT_HISTORY_MAX_POINTS', 5000))
 
 # Initialize extensions
+if is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+    install_sqlite_pragmas()
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
 migrate = Migrate(app, db)
 
+if os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+    init_metrics(app)
+
+if app.config['COMPRESS_ENABLED']:
+    init_compression(app)
+
 # APISpec configuration for Swagger
 app.config.update({
     'APISPEC_SPEC': APISpec(
@@ -34,10 +76,14 @@ app.config.update({
     ),
     'APISPEC_SWAGGER_URL': '/swagger/',  # Swagger JSON
     'APISPEC_SWAGGER_UI_URL': '/swagger-ui/',  # Swagger UI
+    # Build the spec on the first /swagger/ request rather than at import
+    'APISPEC_LAZY': os.getenv('APISPEC_LAZY', 'true').lower() in ('1', 'true', 'yes'),
+    # Spec precomputed with `flask openapi`, served as-is when the file exists
+    'APISPEC_CACHE_FILE': os.getenv('APISPEC_CACHE_FILE'),
 })
 
 # Initialize FlaskApiSpec
-docs = FlaskApiSpec(app)
+docs = LazyFlaskApiSpec(app)
 
 # Root route
 @app.route('/')
@@ -68,6 +114,7 @@ from routes.vessels import (
     add_vessel,
     update_vessel,
     delete_vessel,
+    get_upcoming_arrivals,
 )
 
 
@@ -89,6 +136,7 @@ docs.register(get_vessels, blueprint='vessels')
 docs.register(add_vessel, blueprint='vessels')
 docs.register(update_vessel, blueprint='vessels')
 docs.register(delete_vessel, blueprint='vessels')
+docs.register(get_upcoming_arrivals, blueprint='vessels')
 
 from routes.cargo import (
     cargo_bp,
@@ -96,6 +144,13 @@ from routes.cargo import (
     add_cargo,
     update_cargo,
     delete_cargo,
+    export_cargo,
+    add_cargo_bulk,
+    get_cargo_stats,
+    lookup_cargo,
+    update_cargo_statuses,
+    get_cargo_history,
+    get_cargo_status_as_of,
 )
 
 # Register blueprint
@@ -106,11 +161,22 @@ docs.register(get_cargo, blueprint='cargo')
 docs.register(add_cargo, blueprint='cargo')
 docs.register(update_cargo, blueprint='cargo')
 docs.register(delete_cargo, blueprint='cargo')
+docs.register(export_cargo, blueprint='cargo')
+docs.register(add_cargo_bulk, blueprint='cargo')
+docs.register(get_cargo_stats, blueprint='cargo')
+docs.register(lookup_cargo, blueprint='cargo')
+docs.register(update_cargo_statuses, blueprint='cargo')
+docs.register(get_cargo_history, blueprint='cargo')
+docs.register(get_cargo_status_as_of, blueprint='cargo')
 
 from routes.environment import (
     environment_bp,
     get_environment_metrics,
     get_environmental_alerts,
+    get_environment_history,
+    get_active_alerts,
+    get_alert_rules,
+    add_alert_rule,
 )
 
 # Register blueprint
@@ -119,22 +185,41 @@ app.register_blueprint(environment_bp, url_prefix='/environment')
 # Register routes for documentation
 docs.register(get_environment_metrics, blueprint='environment')
 docs.register(get_environmental_alerts, blueprint='environment')
+docs.register(get_environment_history, blueprint='environment')
+docs.register(get_active_alerts, blueprint='environment')
+docs.register(get_alert_rules, blueprint='environment')
+docs.register(add_alert_rule, blueprint='environment')
+
+from environment_store import EnvironmentPoller, init_environment_poller
+
+if app.config['ENVIRONMENT_POLLER']:
+    init_environment_poller(app)
 
 from routes.services import (
     services_bp,
     get_services,
     add_service_request,
+    get_service_catalog_stats,
+    get_service_requests,
 )
 
 # Register blueprint
 app.register_blueprint(services_bp, url_prefix='/services')
 
-from routes.resources import resources_bp, get_resources, allocate_resource
+from routes.resources import (
+    resources_bp,
+    get_resources,
+    allocate_resource,
+    allocate_resources,
+    release_resources,
+)
 
 
 # Register routes for documentation
 docs.register(get_services, blueprint='services')
 docs.register(add_service_request, blueprint='services')
+docs.register(get_service_catalog_stats, blueprint='services')
+docs.register(get_service_requests, blueprint='services')
 
 # Register blueprint
 app.register_blueprint(resources_bp, url_prefix='/resources')
@@ -142,6 +227,29 @@ app.register_blueprint(resources_bp, url_prefix='/resources')
 # Register routes for documentation
 docs.register(get_resources, blueprint='resources')
 docs.register(allocate_resource, blueprint='resources')
+docs.register(allocate_resources, blueprint='resources')
+docs.register(release_resources, blueprint='resources')
+
+if not app.config['APISPEC_LAZY']:
+    docs.build()
+
+
+@app.cli.command('openapi')
+@click.argument('path', default='openapi.json')
+def export_openapi(path):
+    """
+    Write the OpenAPI spec to PATH, to be served through APISPEC_CACHE_FILE.
+    """
+    docs.write(path)
+    click.echo(f"OpenAPI spec written to {path}")
+
+
+@app.cli.command('poll-environment')
+def poll_environment():
+    """
+    Run the environment poller in the foreground. Run exactly one per deployment.
+    """
+    EnvironmentPoller(app).run()
 
 
 # Run the app
@@ -0,0 +1,45 @@
+"""
+Compare cargo ingestion through POST /cargo/ (one row per request)
+with POST /cargo/bulk (one request per batch).
+
+    python -m benchmarks.bench_cargo_bulk --rows 5000
+"""
+import argparse
+
+from benchmarks.common import app, setup_database, auth_headers, timed
+
+
+def single_row(client, headers, rows):
+    for row in rows:
+        response = client.post('/cargo/', json=row, headers=headers)
+        assert response.status_code == 201, response.data
+
+
+def bulk(client, headers, rows, batch):
+    for start in range(0, len(rows), batch):
+        response = client.post('/cargo/bulk', json=rows[start:start + batch], headers=headers)
+        assert response.status_code == 200 and not response.json["conflicts"], response.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=5000, help="rows per /cargo/bulk request")
+    args = parser.parse_args()
+
+    client = app.test_client()
+    results = {}
+    for name, run in (
+        ("single-row", lambda rows: single_row(client, headers, rows)),
+        ("bulk", lambda rows: bulk(client, headers, rows, args.batch)),
+    ):
+        headers = auth_headers(setup_database()["editor"])
+        rows = [{"tracking_id": f"{name}-{i}", "status": "in-transit"} for i in range(args.rows)]
+        _, elapsed = timed(run, rows)
+        results[name] = args.rows / elapsed
+        print(f"{name:>10}: {args.rows} rows in {elapsed:.2f}s ({results[name]:,.0f} rows/s)")
+    print(f"speedup: {results['bulk'] / results['single-row']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Report the CPU cost and the bytes saved by response compression for the large list
+responses and the streamed export, per encoding and compression level.
+
+    python -m benchmarks.bench_compression --rows 20000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import app, setup_database, auth_headers
+from app import db
+from compression import brotli
+from models import Cargo, Vessel
+from utils import MAX_PAGE_LIMIT
+
+URLS = (f"/vessels/?limit={MAX_PAGE_LIMIT}", f"/cargo/?limit={MAX_PAGE_LIMIT}", "/cargo/export")
+
+
+def seed(rows):
+    start = datetime(2026, 1, 1)
+    with app.app_context():
+        db.session.execute(Vessel.__table__.insert(), [
+            {"name": f"vessel-{i}", "schedule": "2026-01-01 08:00",
+             "arrival_at": start + timedelta(minutes=i), "departure_at": None}
+            for i in range(rows)
+        ])
+        db.session.execute(Cargo.__table__.insert(), [
+            {"tracking_id": f"cargo-{i}", "status": ("in-transit", "delivered", "held")[i % 3]}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def settings():
+    yield "identity", None, None
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", "gzip", level
+    if brotli is not None:
+        for quality in (1, 4, 9, 11):
+            yield f"br-{quality}", "br", quality
+
+
+def measure(client, headers, url, repeat):
+    """
+    Process CPU seconds per request and the size of the body on the wire.
+    """
+    client.get(url, headers=headers)  # Warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        response = client.get(url, headers=headers)
+        size = len(response.get_data())
+    return (time.process_time() - start) / repeat, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="vessel and cargo rows")
+    parser.add_argument("--repeat", type=int, default=5, help="requests per URL and setting")
+    args = parser.parse_args()
+
+    token = setup_database()["viewer"]
+    seed(args.rows)
+    client = app.test_client()
+
+    for url in URLS:
+        baseline_cpu = baseline_size = None
+        print(url)
+        for name, encoding, level in settings():
+            if encoding == "gzip":
+                app.config['COMPRESS_LEVEL'] = level
+            elif encoding == "br":
+                app.config['COMPRESS_BROTLI_QUALITY'] = level
+            headers = dict(auth_headers(token), **{"Accept-Encoding": encoding or "identity"})
+            cpu, size = measure(client, headers, url, args.repeat)
+            if encoding is None:
+                baseline_cpu, baseline_size = cpu, size
+                print(f"  {name:>8}: {cpu * 1000:7.1f} ms CPU {size:>10,} bytes")
+                continue
+            saved = baseline_size - size
+            extra_ms = (cpu - baseline_cpu) * 1000
+            print(f"  {name:>8}: {cpu * 1000:7.1f} ms CPU {size:>10,} bytes "
+                  f"({size / baseline_size:6.1%}), {extra_ms / (saved / 1e6):6.1f} ms extra CPU per MB saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Concurrent write throughput with the default and the tuned database engine profile.
+Each profile runs in a fresh interpreter, since the profile is applied when the app is imported.
+
+    python -m benchmarks.bench_db_writes --threads 16 --writes 100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+
+
+def run_profile(args):
+    from benchmarks.common import app, setup_database, auth_headers, timed
+
+    headers = auth_headers(setup_database()["editor"])
+    statuses = {}
+    lock = threading.Lock()
+
+    def writer(n):
+        client = app.test_client()
+        for i in range(args.writes):
+            try:
+                code = client.post('/cargo/', json={"tracking_id": f"w{n}-{i}", "status": "held"}, headers=headers).status_code
+            except Exception:
+                # Raised through the test client, e.g. OperationalError: database is locked
+                code = "error"
+            # Mix in reads so readers and the writer contend, as they do in production
+            client.get('/cargo/?limit=20', headers=headers)
+            with lock:
+                statuses[code] = statuses.get(code, 0) + 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(args.threads)]
+    _, elapsed = timed(lambda: ([t.start() for t in threads], [t.join() for t in threads]))
+    print(json.dumps({"elapsed": elapsed, "statuses": {str(k): v for k, v in statuses.items()}}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=100, help="writes per thread")
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        return run_profile(args)
+
+    for profile in ("default", "tuned"):
+        env = dict(os.environ, DB_ENGINE_PROFILE=profile)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_writes", "--profile", profile,
+             "--threads", str(args.threads), "--writes", str(args.writes)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        ok = result["statuses"].get("201", 0)
+        failed = sum(result["statuses"].values()) - ok
+        print(f"{profile:>8}: {ok / result['elapsed']:,.0f} successful writes/s, {failed} failed, {result['elapsed']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
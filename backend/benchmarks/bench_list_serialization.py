@@ -0,0 +1,71 @@
+"""
+Compare list endpoint throughput with the marshmallow path and the projected fast path
+(FAST_SERIALIZATION), paging through every row with the largest page size.
+
+    python -m benchmarks.bench_list_serialization --rows 20000
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.common import app, setup_database, auth_headers, timed
+from app import db
+from models import Cargo, Resource, Vessel
+from serialization import orjson
+from utils import MAX_PAGE_LIMIT
+
+ENDPOINTS = ("/vessels/", "/cargo/", "/resources/")
+
+
+def seed(rows):
+    start = datetime(2026, 1, 1)
+    with app.app_context():
+        db.session.execute(Vessel.__table__.insert(), [
+            {"name": f"vessel-{i}", "schedule": "2026-01-01 08:00",
+             "arrival_at": start + timedelta(minutes=i), "departure_at": None}
+            for i in range(rows)
+        ])
+        db.session.execute(Cargo.__table__.insert(), [
+            {"tracking_id": f"cargo-{i}", "status": "in-transit"} for i in range(rows)
+        ])
+        db.session.execute(Resource.__table__.insert(), [
+            {"name": f"resource-{i}", "is_allocated": i % 2 == 0} for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def read_all(client, headers, url):
+    rows, after = 0, None
+    while True:
+        query = f"?limit={MAX_PAGE_LIMIT}" + (f"&after={after}" if after else "")
+        response = client.get(url + query, headers=headers)
+        assert response.status_code == 200, response.data
+        rows += len(response.json)
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="full scans per endpoint and path")
+    args = parser.parse_args()
+
+    headers = auth_headers(setup_database()["viewer"])
+    seed(args.rows)
+    client = app.test_client()
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+
+    for url in ENDPOINTS:
+        results = {}
+        for name, fast in (("marshmallow", False), ("fast", True)):
+            app.config['FAST_SERIALIZATION'] = fast
+            read_all(client, headers, url)  # Warm up
+            best = min(timed(read_all, client, headers, url)[1] for _ in range(args.repeat))
+            results[name] = args.rows / best
+            print(f"{url:<12} {name:>11}: {results[name]:,.0f} rows/s")
+        print(f"{url:<12} {'speedup':>11}: {results['fast'] / results['marshmallow']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Login storm benchmark: many clients log in at once while others keep polling
+GET /vessels/. Reports login throughput and the latency of the polling requests,
+with bcrypt run inline on the request threads and on the process pool.
+
+    python -m benchmarks.bench_login_storm --logins 200 --login-threads 16
+"""
+import argparse
+import threading
+import time
+
+import requests
+
+from benchmarks.common import app, db, setup_database, auth_headers, percentile, serve
+from models import User
+from passwords import password_hasher
+
+PASSWORD = "storm-password"
+
+
+def run(base_url, token, args):
+    login_latencies, poll_latencies, busy = [], [], [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_worker(count):
+        session = requests.Session()
+        for _ in range(count):
+            start = time.perf_counter()
+            response = session.post(f"{base_url}/users/login", json={"username": "storm", "password": PASSWORD})
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code == 503:
+                    busy[0] += 1
+                else:
+                    assert response.status_code == 200, response.text
+                    login_latencies.append(elapsed)
+
+    def poll_worker():
+        session = requests.Session()
+        while not done.is_set():
+            start = time.perf_counter()
+            response = session.get(f"{base_url}/vessels/", headers=auth_headers(token))
+            assert response.status_code == 200, response.text
+            with lock:
+                poll_latencies.append(time.perf_counter() - start)
+
+    per_thread = args.logins // args.login_threads
+    pollers = [threading.Thread(target=poll_worker) for _ in range(args.poll_threads)]
+    logins = [threading.Thread(target=login_worker, args=(per_thread,)) for _ in range(args.login_threads)]
+    start = time.perf_counter()
+    for thread in pollers + logins:
+        thread.start()
+    for thread in logins:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in pollers:
+        thread.join()
+
+    return {
+        "logins_per_s": len(login_latencies) / elapsed,
+        "login_p99_ms": percentile(login_latencies, 99) * 1000,
+        "rejected_busy": busy[0],
+        "poll_requests": len(poll_latencies),
+        "poll_p50_ms": percentile(poll_latencies, 50) * 1000,
+        "poll_p99_ms": percentile(poll_latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--poll-threads", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=app.config['PASSWORD_HASH_WORKERS'],
+                        help="process pool size for the pooled run")
+    args = parser.parse_args()
+
+    token = setup_database()["viewer"]
+    with app.app_context():
+        db.session.add(User(username="storm", password=password_hasher.hash(PASSWORD), role="viewer"))
+        db.session.commit()
+
+    base_url, server = serve()
+    try:
+        for label, workers in (("inline", 0), (f"pool({args.workers})", args.workers)):
+            app.config['PASSWORD_HASH_WORKERS'] = workers
+            result = run(base_url, token, args)
+            print(f"{label:>10}: " + ", ".join(f"{key}={value:,.1f}" for key, value in result.items()))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
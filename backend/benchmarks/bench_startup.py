@@ -0,0 +1,63 @@
+"""
+Cold start benchmark: time from `import app` to the first served request, and the
+latency of the first /swagger/ request, with the OpenAPI spec built eagerly at import,
+lazily on first use, and precomputed with `flask openapi`.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+client = app.app.test_client()
+client.get('/')
+ready = time.perf_counter()
+client.get('/swagger/')
+print(json.dumps({"first_request": ready - start, "first_swagger": time.perf_counter() - ready}))
+"""
+
+
+def probe(env):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base_env = dict(os.environ, DATABASE_URI="sqlite:///:memory:", METRICS_ENABLED="false")
+    cache_file = os.path.join(tempfile.mkdtemp(prefix="port-bench-"), "openapi.json")
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "app", "openapi", cache_file],
+        env=base_env, capture_output=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+    profiles = {
+        "eager": dict(base_env, APISPEC_LAZY="false"),
+        "lazy": dict(base_env, APISPEC_LAZY="true"),
+        "precomputed": dict(base_env, APISPEC_LAZY="true", APISPEC_CACHE_FILE=cache_file),
+    }
+    probe(base_env)  # warm the filesystem and bytecode caches
+    for name, env in profiles.items():
+        results = [probe(env) for _ in range(args.runs)]
+        first_request = statistics.median(r["first_request"] for r in results) * 1000
+        first_swagger = statistics.median(r["first_swagger"] for r in results) * 1000
+        print(f"{name:>12}: import to first request {first_request:7.1f} ms, first /swagger/ {first_swagger:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
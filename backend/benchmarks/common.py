@@ -0,0 +1,108 @@
+"""
+Shared setup for the benchmark scripts.
+
+Importing this module points the app at a throwaway SQLite database, so it must be
+imported before `app`. Run the scripts from the backend directory, e.g.
+`python -m benchmarks.bench_cargo_bulk`.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = tempfile.mkdtemp(prefix="port-bench-")
+os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(BENCH_DIR, 'bench.db')}"
+# Keep background polling out of the measurements
+os.environ.setdefault("ENVIRONMENT_POLLER", "false")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+from app import app, db  # noqa: E402
+from models import User  # noqa: E402
+
+ROLES = ("viewer", "editor", "admin", "operator")
+
+
+def setup_database():
+    """
+    Create the schema and one user per role. Returns a {role: access_token} mapping.
+    """
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"bench-{role}", password="!", role=role) for role in ROLES]
+        db.session.add_all(users)
+        db.session.commit()
+        return {user.role: create_access_token(identity=str(user.id)) for user in users}
+
+
+def auth_headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def timed(fn, *args, **kwargs):
+    """
+    Call fn and return (result, elapsed seconds).
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of `values` (pct in 0-100).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def serve(threaded=True):
+    """
+    Start the app on a local port in a background thread. Returns (base_url, server).
+    Call server.shutdown() when done.
+    """
+    server = make_server("127.0.0.1", 0, app, threaded=threaded)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+class WeatherStub(BaseHTTPRequestHandler):
+    """
+    Answers WeatherAPI's /current.json with a fixed reading after an optional delay.
+    """
+    delay = 0.0
+    status = 200
+    reading = {"temp_c": 24.0, "humidity": 60, "wind_kph": 18.0, "vis_km": 10.0}
+    hits = 0
+
+    def do_GET(self):
+        WeatherStub.hits += 1
+        time.sleep(self.delay)
+        body = json.dumps({"current": self.reading}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_weather_stub():
+    """
+    Start a WeatherStub server and point the app's WeatherAPI client at it. Returns the server.
+    """
+    import weather
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WeatherStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    weather.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+    weather.weather_cache.invalidate()
+    return server
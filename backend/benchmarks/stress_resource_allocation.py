@@ -0,0 +1,71 @@
+"""
+Concurrency stress test for resource allocation: many threads race to
+allocate the same resources, singly and in batches, and every resource
+must end up won by exactly one request.
+
+    python -m benchmarks.stress_resource_allocation --threads 32 --resources 50
+"""
+import argparse
+import random
+import threading
+from collections import Counter
+
+from benchmarks.common import app, db, setup_database, auth_headers, timed
+from models import Resource
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--resources", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=3, help="resources per batch allocation")
+    args = parser.parse_args()
+
+    headers = auth_headers(setup_database()["operator"])
+    with app.app_context():
+        db.session.add_all([Resource(name=f"crane-{i}") for i in range(args.resources)])
+        db.session.commit()
+        resource_ids = [id for (id,) in db.session.query(Resource.id)]
+
+    wins = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(args.threads)
+
+    def worker(seed):
+        client = app.test_client()
+        rng = random.Random(seed)
+        order = resource_ids[:]
+        rng.shuffle(order)
+        start.wait()
+        for i, resource_id in enumerate(order):
+            if i % 2:
+                batch = [resource_id] + rng.sample(resource_ids, args.batch - 1)
+                response = client.post('/resources/allocate/batch', json={"resource_ids": batch}, headers=headers)
+                won = response.json["resource_ids"] if response.status_code == 200 else []
+            else:
+                response = client.post('/resources/allocate', json={"resource_id": resource_id}, headers=headers)
+                won = [resource_id] if response.status_code == 200 else []
+            assert response.status_code in (200, 400), response.data
+            with lock:
+                wins.update(won)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    _, elapsed = timed(lambda: ([t.start() for t in threads], [t.join() for t in threads]))
+
+    with app.app_context():
+        allocated = {id for (id,) in db.session.query(Resource.id).filter(Resource.is_allocated.is_(True))}
+    double = sorted(id for id, count in wins.items() if count > 1)
+    print(f"{args.threads} threads, {args.resources} resources, {elapsed:.2f}s")
+    print(f"allocated: {len(allocated)}/{args.resources}, double allocations: {double or 'none'}")
+    assert not double, "a resource was allocated by more than one request"
+    assert allocated == set(wins), "database state does not match the successful responses"
+
+    # Release everything in one all-or-nothing batch
+    client = app.test_client()
+    response = client.post('/resources/release/batch', json={"resource_ids": resource_ids}, headers=headers)
+    assert response.status_code == 200, response.data
+    print("released all resources in one batch")
+
+
+if __name__ == "__main__":
+    main()
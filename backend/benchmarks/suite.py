@@ -0,0 +1,313 @@
+"""
+Benchmark suite: seeds a synthetic port dataset and drives every route, reporting
+throughput and p50/p95/p99 latency per endpoint to a JSON file.
+
+    python -m benchmarks.suite --vessels 2000 --cargo 20000 --output bench.json
+    python -m benchmarks.suite --mode http --threads 8 --compare bench.json
+
+In `client` mode requests go through the Flask test client on one thread; in `http`
+mode they are sent over HTTP to a threaded server by --threads concurrent clients.
+The environment routes talk to a local WeatherAPI stub.
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import requests
+
+from benchmarks.common import (
+    app,
+    db,
+    setup_database,
+    auth_headers,
+    percentile,
+    serve,
+    start_weather_stub,
+)
+from models import Cargo, CargoStatusCount, Resource, Service, ServiceRequest, User, Vessel
+from passwords import password_hasher
+
+STATUSES = ("in-transit", "held", "cleared", "loaded", "discharged")
+LOGIN_PASSWORD = "bench-password"
+
+
+class Scenario:
+    """
+    One benchmarked request. `path` and `body` may be callables taking the iteration number.
+    """
+    def __init__(self, name, method, path, role="viewer", body=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.body = body
+
+    def request(self, i):
+        path = self.path(i) if callable(self.path) else self.path
+        body = self.body(i) if callable(self.body) else self.body
+        return path, body
+
+
+def seed(args):
+    """
+    Fill the database with the synthetic dataset. Returns access tokens and the IDs
+    reserved for the destructive scenarios.
+    """
+    tokens = setup_database()
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    spare = args.iterations
+
+    with app.app_context():
+        db.session.add(User(username="bench-login", password=password_hasher.hash(LOGIN_PASSWORD), role="viewer"))
+        db.session.add_all(User(username=f"bench-spare-{i}", password="!", role="viewer") for i in range(spare))
+
+        vessels = []
+        for i in range(args.vessels + spare):
+            arrival = now + timedelta(minutes=rng.randint(-7 * 24 * 60, 7 * 24 * 60))
+            vessels.append({
+                "name": f"Vessel {i}",
+                "schedule": arrival.strftime("%Y-%m-%d %H:%M"),
+                "arrival_at": arrival,
+                "departure_at": arrival + timedelta(hours=rng.randint(4, 48)),
+            })
+        db.session.execute(Vessel.__table__.insert(), vessels)
+
+        cargo = [
+            {"tracking_id": str(100000 + i), "status": rng.choice(STATUSES)}
+            for i in range(args.cargo + spare)
+        ]
+        for start in range(0, len(cargo), 10000):
+            db.session.execute(Cargo.__table__.insert(), cargo[start:start + 10000])
+
+        db.session.execute(Service.__table__.insert(), [
+            {"name": f"Service {i}", "description": f"Synthetic port service {i}"} for i in range(args.services)
+        ])
+        db.session.execute(Resource.__table__.insert(), [
+            {"name": f"Crane {i}", "is_allocated": False} for i in range(args.resources + spare)
+        ])
+        db.session.commit()
+
+        db.session.execute(ServiceRequest.__table__.insert(), [
+            {"vessel_id": rng.randint(1, args.vessels), "service_id": rng.randint(1, args.services), "created_at": now}
+            for _ in range(args.service_requests)
+        ])
+        db.session.commit()
+        # Rebuild the status counters to match the bulk-inserted rows
+        db.session.query(CargoStatusCount).delete()
+        db.session.execute(CargoStatusCount.__table__.insert(), [
+            {"status": status, "count": count}
+            for status, count in Counter(row["status"] for row in cargo).items()
+        ])
+        db.session.commit()
+
+        spare_users = [id for (id,) in db.session.query(User.id).filter(User.username.like("bench-spare-%")).order_by(User.id)]
+        editor_id = db.session.query(User.id).filter_by(role="editor").scalar()
+
+    return tokens, {
+        "vessels": list(range(args.vessels + 1, args.vessels + spare + 1)),
+        "cargo": [str(100000 + args.cargo + i) for i in range(spare)],
+        "resources": list(range(args.resources + 1, args.resources + spare + 1)),
+        "users": spare_users,
+        "editor": editor_id,
+    }
+
+
+def scenarios(args, spare):
+    unique = itertools.count()
+    now = datetime.utcnow()
+    window = f"from={(now - timedelta(hours=12)).isoformat()}&to={(now + timedelta(hours=12)).isoformat()}"
+    some_cargo = lambda i: str(100000 + (i * 7919) % args.cargo)
+
+    return [
+        # Users
+        Scenario("users.register", "POST", "/users/register", None,
+                 lambda i: {"username": f"bench-new-{next(unique)}", "password": LOGIN_PASSWORD}),
+        Scenario("users.login", "POST", "/users/login", None,
+                 {"username": "bench-login", "password": LOGIN_PASSWORD}),
+        Scenario("users.get", "GET", lambda i: f"/users/{spare['editor']}", "admin"),
+        Scenario("users.update_role", "PUT", lambda i: f"/users/{spare['users'][i]}/role", "admin",
+                 lambda i: {"role": ("editor", "viewer")[i % 2]}),
+        Scenario("users.delete", "DELETE", lambda i: f"/users/{spare['users'][i]}", "admin"),
+        # Vessels
+        Scenario("vessels.list", "GET", "/vessels/?limit=100"),
+        Scenario("vessels.list_range", "GET", f"/vessels/?limit=100&{window}"),
+        Scenario("vessels.upcoming", "GET", "/vessels/upcoming?hours=6"),
+        Scenario("vessels.add", "POST", "/vessels/", "editor",
+                 lambda i: {"name": f"New vessel {next(unique)}", "schedule": now.strftime("%Y-%m-%d %H:%M")}),
+        Scenario("vessels.update", "PUT", lambda i: f"/vessels/{1 + i % args.vessels}", "editor",
+                 lambda i: {"name": f"Vessel {i}", "schedule": now.strftime("%Y-%m-%d %H:%M")}),
+        Scenario("vessels.delete", "DELETE", lambda i: f"/vessels/{spare['vessels'][i]}", "admin"),
+        # Cargo
+        Scenario("cargo.get", "GET", lambda i: f"/cargo/{some_cargo(i)}"),
+        Scenario("cargo.list", "GET", "/cargo/?limit=100"),
+        Scenario("cargo.stats", "GET", "/cargo/stats"),
+        Scenario("cargo.lookup", "POST", "/cargo/lookup", "viewer",
+                 lambda i: {"tracking_ids": [some_cargo(i + k) for k in range(50)]}),
+        Scenario("cargo.add", "POST", "/cargo/", "editor",
+                 lambda i: {"tracking_id": f"new-{next(unique)}", "status": "in-transit"}),
+        Scenario("cargo.bulk", "POST", "/cargo/bulk", "editor",
+                 lambda i: [{"tracking_id": f"bulk-{next(unique)}", "status": "held"} for _ in range(100)]),
+        Scenario("cargo.update", "PUT", lambda i: f"/cargo/{some_cargo(i)}", "editor",
+                 lambda i: {"status": STATUSES[i % len(STATUSES)]}),
+        Scenario("cargo.delete", "DELETE", lambda i: f"/cargo/{spare['cargo'][i]}", "admin"),
+        Scenario("cargo.export", "GET", "/cargo/export"),
+        # Services
+        Scenario("services.list", "GET", "/services/?limit=100"),
+        Scenario("services.request", "POST", "/services/request", "operator",
+                 lambda i: {"vessel_id": 1 + i % args.vessels, "service_id": 1 + i % args.services}),
+        Scenario("services.cache_stats", "GET", "/services/cache", "admin"),
+        # Resources
+        Scenario("resources.list", "GET", "/resources/?limit=100"),
+        Scenario("resources.allocate", "POST", "/resources/allocate", "operator",
+                 lambda i: {"resource_id": spare["resources"][i]}),
+        Scenario("resources.allocate_batch", "POST", "/resources/allocate/batch", "operator",
+                 lambda i: {"resource_ids": [1 + (3 * i + k) % args.resources for k in range(3)]}),
+        Scenario("resources.release_batch", "POST", "/resources/release/batch", "operator",
+                 lambda i: {"resource_ids": [1 + (3 * i + k) % args.resources for k in range(3)]}),
+        # Environment
+        Scenario("environment.metrics", "GET", "/environment/"),
+        Scenario("environment.alerts", "GET", "/environment/alerts", "admin"),
+    ]
+
+
+def run_client(scenario, tokens, iterations):
+    client = app.test_client()
+    headers = auth_headers(tokens[scenario.role]) if scenario.role else {}
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    for i in range(iterations):
+        path, body = scenario.request(i)
+        t0 = time.perf_counter()
+        response = client.open(path, method=scenario.method, json=body, headers=headers)
+        response.get_data()
+        latencies.append(time.perf_counter() - t0)
+        statuses[response.status_code] += 1
+    return latencies, statuses, time.perf_counter() - start
+
+
+def run_http(base_url, scenario, tokens, iterations, threads):
+    headers = auth_headers(tokens[scenario.role]) if scenario.role else {}
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    work = iter(range(iterations))
+
+    def worker():
+        session = requests.Session()
+        for i in work:
+            path, body = scenario.request(i)
+            t0 = time.perf_counter()
+            response = session.request(scenario.method, base_url + path, json=body, headers=headers)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    print(f"\n{'endpoint':<28}{'p50 ms':>18}{'p99 ms':>18}{'req/s':>20}")
+    for name, result in report["endpoints"].items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        print(f"{name:<28}"
+              f"{old['p50_ms']:>8.2f} -> {result['p50_ms']:<7.2f}"
+              f"{old['p99_ms']:>8.2f} -> {result['p99_ms']:<7.2f}"
+              f"{old['throughput_rps']:>9.0f} -> {result['throughput_rps']:<8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vessels", type=int, default=1000)
+    parser.add_argument("--cargo", type=int, default=10000)
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--service-requests", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--mode", choices=("client", "http"), default="client")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent clients in http mode")
+    parser.add_argument("--only", help="comma-separated endpoint name prefixes to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="previous report to compare against")
+    args = parser.parse_args()
+
+    # Keep seeding and the login scenario from being dominated by the bcrypt work factor
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    tokens, spare = seed(args)
+    tokens[None] = None
+    weather_stub = start_weather_stub()
+    base_url, server = serve() if args.mode == "http" else (None, None)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "mode": args.mode,
+            "threads": args.threads if args.mode == "http" else 1,
+            "iterations": args.iterations,
+            "dataset": {key: getattr(args, key) for key in ("vessels", "cargo", "services", "resources", "service_requests")},
+        },
+        "endpoints": {},
+    }
+    only = tuple(args.only.split(",")) if args.only else None
+    try:
+        for scenario in scenarios(args, spare):
+            if only and not scenario.name.startswith(only):
+                continue
+            if args.mode == "http":
+                latencies, statuses, elapsed = run_http(base_url, scenario, tokens, args.iterations, args.threads)
+            else:
+                latencies, statuses, elapsed = run_client(scenario, tokens, args.iterations)
+            result = {
+                "requests": len(latencies),
+                "errors": sum(count for status, count in statuses.items() if status >= 500),
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                "throughput_rps": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+            }
+            report["endpoints"][scenario.name] = result
+            print(f"{scenario.name:<28}{result['throughput_rps']:>9.0f} req/s  "
+                  f"p50 {result['p50_ms']:7.2f}  p95 {result['p95_ms']:7.2f}  p99 {result['p99_ms']:7.2f} ms  "
+                  f"{result['statuses']}")
+    finally:
+        weather_stub.shutdown()
+        if server:
+            server.shutdown()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
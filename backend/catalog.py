@@ -0,0 +1,113 @@
+import threading
+import time
+from bisect import bisect_right
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Service, TableVersion
+from app import db
+from utils import bump_table_version
+
+
+class ServiceCatalog:
+    """
+    Process-local copy of the Service table, which is near-static reference data.
+
+    The copy is reloaded on the first read after invalidate() is called, after a commit
+    that wrote a Service through the ORM, once the 'service' table version differs from the
+    one it was loaded at (a Service write from any process), or after SERVICE_CATALOG_TTL
+    seconds (0 keeps it until invalidated).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services = None
+        self._ids = []
+        self._loaded_at = None
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def list(self, limit, after=None):
+        """
+        Return one page of services ordered by ID and the cursor of the next page.
+        """
+        services, ids = self._load()
+        start = 0 if after is None else bisect_right(ids, after)
+        page = services[start:start + limit]
+        next_cursor = page[-1]["id"] if start + limit < len(services) else None
+        return page, next_cursor
+
+    def exists(self, service_id):
+        _, ids = self._load()
+        index = bisect_right(ids, service_id)
+        return index > 0 and ids[index - 1] == service_id
+
+    def invalidate(self):
+        with self._lock:
+            self._services = None
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._services or ()),
+                "age_seconds": age,
+            }
+
+    def _load(self):
+        ttl = current_app.config['SERVICE_CATALOG_TTL']
+        # Read before the rows, so a write committed in between only causes an extra reload
+        version = db.session.query(TableVersion.version).filter_by(table_name='service').scalar() or 0
+        with self._lock:
+            if self._services is not None and self._version == version \
+                    and (not ttl or time.monotonic() - self._loaded_at < ttl):
+                self.hits += 1
+                return self._services, self._ids
+
+            self.misses += 1
+            self._version = version
+            rows = db.session.query(Service.id, Service.name, Service.description).order_by(Service.id)
+            self._services = [{"id": id, "name": name, "description": description} for id, name, description in rows]
+            self._ids = [service["id"] for service in self._services]
+            self._loaded_at = time.monotonic()
+            return self._services, self._ids
+
+
+service_catalog = ServiceCatalog()
+
+
+# Invalidate once a transaction that wrote a Service has committed, so a concurrent
+# reader cannot reload the catalog from uncommitted state.
+def _mark_catalog_dirty(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info['service_catalog_dirty'] = True
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Service, _event_name, _mark_catalog_dirty)
+
+
+# Bump the 'service' table version in the same flush as the Service write, so the
+# ETag served by the conditional services listing changes with the commit.
+@event.listens_for(Session, 'before_flush')
+def _bump_service_version(session, flush_context, instances):
+    if any(isinstance(obj, Service) for obj in (*session.new, *session.dirty, *session.deleted)):
+        bump_table_version('service', session=session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('service_catalog_dirty', False):
+        service_catalog.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('service_catalog_dirty', None)
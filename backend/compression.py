@@ -0,0 +1,94 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered when brotli is not installed
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/plain",
+    "text/html",
+}
+
+
+def _encoding_for(response):
+    """
+    Content coding to apply to `response`, or None to send it as is.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers:
+        return None
+    if response.status_code < 200 or response.status_code in (204, 304) or request.method == "HEAD":
+        return None
+    if not response.is_streamed and response.content_length is not None \
+            and response.content_length < current_app.config['COMPRESS_MIN_SIZE']:
+        return None
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _compressor(encoding):
+    """
+    Return (compress, flush, finish) callables for one response body.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+        return compressor.process, compressor.flush, compressor.finish
+    # wbits 31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(current_app.config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _compress_stream(chunks, compressor, charset):
+    """
+    Compress a streamed body chunk by chunk, flushing after each one so the client
+    receives every chunk as soon as the view yields it.
+    """
+    compress, flush, finish = compressor
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def compress_response(response):
+    """
+    Compress the response body with the best coding the client accepts. Buffered bodies
+    below COMPRESS_MIN_SIZE bytes are left alone; streamed ones are compressed incrementally.
+    """
+    if response.mimetype in COMPRESSIBLE_MIMETYPES:
+        response.vary.add("Accept-Encoding")
+    encoding = _encoding_for(response)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # Built here: the body is consumed after the app context is gone
+        response.response = _compress_stream(response.response, _compressor(encoding), "utf-8")
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+            return response
+        compress, _, finish = _compressor(encoding)
+        response.set_data(compress(body) + finish())
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    """
+    Compress JSON, NDJSON, CSV and text responses according to Accept-Encoding.
+    """
+    app.after_request(compress_response)
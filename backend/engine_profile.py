@@ -0,0 +1,61 @@
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+# Settings are read when called rather than at import, so values loaded from .env apply.
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+def _tuned():
+    # 'tuned' applies the settings below; 'default' leaves SQLAlchemy's defaults untouched
+    return os.getenv('DB_ENGINE_PROFILE', 'tuned') == 'tuned'
+
+
+def is_sqlite(database_uri):
+    return make_url(database_uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(database_uri):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for the given database from the environment.
+    """
+    if not _tuned():
+        return {}
+    if is_sqlite(database_uri):
+        # pysqlite's own lock wait, in seconds
+        return {"connect_args": {"timeout": int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000}}
+    return {
+        "pool_size": int(os.getenv('DB_POOL_SIZE', 10)),
+        "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        "pool_timeout": int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        "pool_recycle": int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        "pool_pre_ping": _env_bool('DB_POOL_PRE_PING', 'true'),
+    }
+
+
+def install_sqlite_pragmas():
+    """
+    Apply PRAGMAs to every new SQLite connection: WAL journaling so readers do not block
+    the writer, a busy timeout instead of failing with 'database is locked', and
+    synchronous=NORMAL, which is safe in WAL mode and much cheaper than FULL.
+    """
+    if not _tuned():
+        return
+    journal_mode = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    synchronous = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+    @event.listens_for(Engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        cursor.close()
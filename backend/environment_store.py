@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models import EnvironmentReading, EnvironmentRollup
+from app import db
+from weather import LOCATION, fetch_current_conditions, weather_cache
+from alerts import WINDOW_SLACK, evaluate_rules
+
+METRICS = ("temperature", "humidity", "wind_speed", "visibility")
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Seconds between two retention passes of the poller
+PRUNE_INTERVAL = 3600
+
+
+def bucket_start(value, resolution):
+    """
+    Start of the `resolution` bucket that contains `value`.
+    """
+    if resolution == "minute":
+        return value.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record_reading(location, conditions, recorded_at=None):
+    """
+    Store one reading and fold it into the minute, hour and day rollups, inside the
+    caller's transaction. Rollups are only written by the poller, so a read-modify-write
+    per bucket is enough.
+    """
+    recorded_at = recorded_at or datetime.utcnow()
+    reading = EnvironmentReading(location=location, recorded_at=recorded_at,
+                                 **{metric: conditions[metric] for metric in METRICS})
+    db.session.add(reading)
+
+    for resolution in RESOLUTIONS:
+        key = (resolution, location, bucket_start(recorded_at, resolution))
+        rollup = db.session.get(EnvironmentRollup, key)
+        if rollup is None:
+            rollup = EnvironmentRollup(resolution=key[0], location=key[1], bucket_start=key[2], count=0)
+            for metric in METRICS:
+                setattr(rollup, f"{metric}_sum", 0.0)
+                setattr(rollup, f"{metric}_min", conditions[metric])
+                setattr(rollup, f"{metric}_max", conditions[metric])
+            db.session.add(rollup)
+        rollup.count += 1
+        for metric in METRICS:
+            value = conditions[metric]
+            setattr(rollup, f"{metric}_sum", getattr(rollup, f"{metric}_sum") + value)
+            setattr(rollup, f"{metric}_min", min(getattr(rollup, f"{metric}_min"), value))
+            setattr(rollup, f"{metric}_max", max(getattr(rollup, f"{metric}_max"), value))
+    return reading
+
+
+def prune(config, now=None):
+    """
+    Delete raw readings and rollups older than their configured retention (0 keeps them).
+    Returns the number of deleted rows.
+    """
+    now = now or datetime.utcnow()
+    deleted = 0
+    raw_days = config['ENVIRONMENT_RAW_RETENTION_DAYS']
+    if raw_days:
+        deleted += EnvironmentReading.query.filter(
+            EnvironmentReading.recorded_at < now - timedelta(days=raw_days)
+        ).delete(synchronize_session=False)
+    for resolution in RESOLUTIONS:
+        days = config[f'ENVIRONMENT_{resolution.upper()}_RETENTION_DAYS']
+        if days:
+            deleted += EnvironmentRollup.query.filter(
+                EnvironmentRollup.resolution == resolution,
+                EnvironmentRollup.bucket_start < now - timedelta(days=days),
+            ).delete(synchronize_session=False)
+    return deleted
+
+
+def history(location, start, end, resolution):
+    """
+    Rollup buckets of `location` between `start` (inclusive) and `end` (exclusive), oldest first.
+    Served by the rollup primary key, so the cost depends on the number of buckets returned.
+    """
+    rollups = EnvironmentRollup.query.filter(
+        EnvironmentRollup.resolution == resolution,
+        EnvironmentRollup.location == location,
+        EnvironmentRollup.bucket_start >= bucket_start(start, resolution),
+        EnvironmentRollup.bucket_start < end,
+    ).order_by(EnvironmentRollup.bucket_start).all()
+
+    points = []
+    for rollup in rollups:
+        point = {"bucket_start": rollup.bucket_start, "count": rollup.count}
+        for metric in METRICS:
+            point[f"{metric}_avg"] = getattr(rollup, f"{metric}_sum") / rollup.count
+            point[f"{metric}_min"] = getattr(rollup, f"{metric}_min")
+            point[f"{metric}_max"] = getattr(rollup, f"{metric}_max")
+        points.append(point)
+    return points
+
+
+class EnvironmentPoller:
+    """
+    Background thread that fetches the current conditions for every configured location
+    every ENVIRONMENT_POLL_INTERVAL seconds, stores them, primes the weather cache
+    with the reading of the port itself and evaluates the alert rules.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config['ENVIRONMENT_POLL_INTERVAL']
+        self.locations = app.config['ENVIRONMENT_POLL_LOCATIONS']
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_prune = None
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="environment-poller", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.poll_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def poll_once(self):
+        """
+        Fetch, store, evaluate and prune once. Errors are logged so one bad cycle does not
+        stop the poller.
+        """
+        with self.app.app_context():
+            for location in self.locations:
+                try:
+                    conditions = fetch_current_conditions(location)
+                except Exception as e:
+                    logging.warning(f"Polling environment for {location} failed: {e}")
+                    continue
+                if location == LOCATION:
+                    weather_cache.put(conditions)
+                try:
+                    record_reading(location, conditions)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Storing environment reading for {location} failed: {e}")
+
+            try:
+                evaluate_rules(slack=max(WINDOW_SLACK, timedelta(seconds=2 * self.interval)))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Evaluating alert rules failed: {e}")
+
+            if self._last_prune is None or time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                try:
+                    deleted = prune(self.app.config)
+                    db.session.commit()
+                    logging.debug(f"Pruned {deleted} environment rows")
+                    self._last_prune = time.monotonic()
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Pruning environment history failed: {e}")
+            db.session.remove()
+
+
+def init_environment_poller(app):
+    """
+    Start the poller with the first request, so CLI commands such as `flask db upgrade`
+    never run it. Only for single-process deployments (ENVIRONMENT_POLLER=true): with
+    several workers each would poll and write the rollups, so run `flask poll-environment`
+    once instead.
+    """
+    poller = EnvironmentPoller(app)
+
+    @app.before_request
+    def _start_environment_poller():
+        if not poller.started:
+            poller.start()
+
+    return poller
@@ -0,0 +1,130 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# [statement count, seconds] for the SQL run by the current request
+_request_sql = ContextVar('request_sql', default=None)
+
+
+class Histogram:
+    """
+    A Prometheus-style histogram with one series per label tuple.
+    """
+    def __init__(self, name, help, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then the sum of observed values
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-1]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status"),
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements executed per HTTP request.", ("method", "route"), COUNT_BUCKETS,
+)
+REQUEST_SQL_TIME = Histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL per HTTP request.", ("method", "route"),
+)
+SQL_STATEMENT_LATENCY = Histogram(
+    "sql_statement_duration_seconds", "Latency of individual SQL statements.", (),
+)
+WEATHER_API_LATENCY = Histogram(
+    "weather_api_request_duration_seconds", "Latency of WeatherAPI calls.", ("outcome",),
+)
+
+ALL_METRICS = (REQUEST_LATENCY, REQUEST_SQL_STATEMENTS, REQUEST_SQL_TIME, SQL_STATEMENT_LATENCY, WEATHER_API_LATENCY)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    SQL_STATEMENT_LATENCY.observe((), elapsed)
+    totals = _request_sql.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += elapsed
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+    _request_sql.set([0, 0.0])
+
+
+def _record_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_LATENCY.observe((request.method, route, str(response.status_code)), time.perf_counter() - start)
+    statements, sql_time = _request_sql.get() or (0, 0.0)
+    REQUEST_SQL_STATEMENTS.observe((request.method, route), statements)
+    REQUEST_SQL_TIME.observe((request.method, route), sql_time)
+    _request_sql.set(None)
+    return response
+
+
+def render_metrics():
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app):
+    """
+    Record per-route latency and SQL usage for every request and serve them at /metrics
+    in the Prometheus text format.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,70 @@
+"""Add indexed vessel arrival/departure times
+
+Revision ID: 5b8e2f0c9d13
+Revises: ac379b67bff9
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f0c9d13'
+down_revision = 'ac379b67bff9'
+branch_labels = None
+depends_on = None
+
+SCHEDULE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+
+def _parse(value):
+    for fmt in SCHEDULE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_schedule(schedule):
+    # "2025-01-20 08:00" or "2025-01-20 08:00 - 2025-01-21 18:00" / "... to ..."
+    for separator in (" - ", " to "):
+        if separator in schedule:
+            arrival, departure = schedule.split(separator, 1)
+            return _parse(arrival), _parse(departure)
+    return _parse(schedule), None
+
+
+def upgrade():
+    op.add_column('vessel', sa.Column('arrival_at', sa.DateTime(), nullable=True))
+    op.add_column('vessel', sa.Column('departure_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_vessel_arrival_at'), 'vessel', ['arrival_at'], unique=False)
+    op.create_index(op.f('ix_vessel_departure_at'), 'vessel', ['departure_at'], unique=False)
+
+    # Backfill the new columns from the free-form schedule strings
+    vessel = sa.table(
+        'vessel',
+        sa.column('id', sa.Integer),
+        sa.column('schedule', sa.String),
+        sa.column('arrival_at', sa.DateTime),
+        sa.column('departure_at', sa.DateTime),
+    )
+    connection = op.get_bind()
+    for id, schedule in connection.execute(sa.select(vessel.c.id, vessel.c.schedule)).fetchall():
+        arrival_at, departure_at = _parse_schedule(schedule or "")
+        if arrival_at or departure_at:
+            connection.execute(
+                vessel.update()
+                .where(vessel.c.id == id)
+                .values(arrival_at=arrival_at, departure_at=departure_at)
+            )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_vessel_departure_at'), table_name='vessel')
+    op.drop_index(op.f('ix_vessel_arrival_at'), table_name='vessel')
+    op.drop_column('vessel', 'departure_at')
+    op.drop_column('vessel', 'arrival_at')
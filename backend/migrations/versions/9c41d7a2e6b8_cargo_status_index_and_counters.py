@@ -0,0 +1,36 @@
+"""Index cargo status and add per-status counters
+
+Revision ID: 9c41d7a2e6b8
+Revises: 5b8e2f0c9d13
+Create Date: 2026-10-17 10:03:17.542981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c41d7a2e6b8'
+down_revision = '5b8e2f0c9d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_cargo_status'), 'cargo', ['status'], unique=False)
+    op.create_table('cargo_status_count',
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+
+    # Seed the counters from the existing rows
+    op.execute(
+        "INSERT INTO cargo_status_count (status, count) "
+        "SELECT status, COUNT(*) FROM cargo GROUP BY status"
+    )
+
+
+def downgrade():
+    op.drop_table('cargo_status_count')
+    op.drop_index(op.f('ix_cargo_status'), table_name='cargo')
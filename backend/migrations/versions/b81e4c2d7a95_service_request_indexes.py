@@ -0,0 +1,43 @@
+"""Add vessel foreign key and listing indexes to service requests
+
+Revision ID: b81e4c2d7a95
+Revises: 7a3c5e9d1f64
+Create Date: 2026-10-17 14:10:27.640193
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e4c2d7a95'
+down_revision = '7a3c5e9d1f64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Requests for vessels that were deleted cannot satisfy the new foreign key. They are
+    # left for the operator to archive or delete rather than dropped here.
+    orphans = op.get_bind().exec_driver_sql(
+        "SELECT COUNT(*) FROM service_request WHERE vessel_id NOT IN (SELECT id FROM vessel)"
+    ).scalar()
+    if orphans:
+        raise RuntimeError(
+            f"{orphans} service_request row(s) reference vessels that no longer exist; "
+            "archive or delete them, then rerun the upgrade"
+        )
+
+    # batch mode so SQLite, which cannot add constraints in place, rebuilds the table
+    with op.batch_alter_table('service_request', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_service_request_vessel_id_vessel', 'vessel', ['vessel_id'], ['id'])
+        batch_op.create_index('ix_service_request_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_service_request_vessel_id_created_at_id', ['vessel_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_service_request_service_id_created_at_id', ['service_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('service_request', schema=None) as batch_op:
+        batch_op.drop_index('ix_service_request_service_id_created_at_id')
+        batch_op.drop_index('ix_service_request_vessel_id_created_at_id')
+        batch_op.drop_index('ix_service_request_created_at_id')
+        batch_op.drop_constraint('fk_service_request_vessel_id_vessel', type_='foreignkey')
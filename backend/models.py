@@ -4,11 +4,23 @@ class Vessel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     schedule = db.Column(db.String(200), nullable=False)
+    arrival_at = db.Column(db.DateTime, nullable=True, index=True)
+    departure_at = db.Column(db.DateTime, nullable=True, index=True)
 
 class Cargo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     tracking_id = db.Column(db.String(100), unique=True, nullable=False)
-    status = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(50), nullable=False, index=True)
+
+class CargoStatusCount(db.Model):
+    # Number of cargo rows per status, maintained by the cargo write routes
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class TableVersion(db.Model):
+    # Bumped by the write routes so list endpoints can answer conditional GETs cheaply
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
 
 class Service(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -29,6 +41,78 @@ class Resource(db.Model):
 
 class ServiceRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    vessel_id = db.Column(db.Integer, nullable=False)
+    vessel_id = db.Column(db.Integer, db.ForeignKey('vessel.id'), nullable=False)
     service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    # Back the newest-first keyset listing, with and without a vessel or service filter
+    __table_args__ = (
+        db.Index('ix_service_request_created_at_id', 'created_at', 'id'),
+        db.Index('ix_service_request_vessel_id_created_at_id', 'vessel_id', 'created_at', 'id'),
+        db.Index('ix_service_request_service_id_created_at_id', 'service_id', 'created_at', 'id'),
+    )
+
+class EnvironmentReading(db.Model):
+    # Raw readings stored by the environment poller, pruned after ENVIRONMENT_RAW_RETENTION_DAYS
+    id = db.Column(db.Integer, primary_key=True)
+    location = db.Column(db.String(100), nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    temperature = db.Column(db.Float, nullable=False)
+    humidity = db.Column(db.SmallInteger, nullable=False)
+    wind_speed = db.Column(db.Float, nullable=False)
+    visibility = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (db.Index('ix_environment_reading_location_recorded_at', 'location', 'recorded_at'),)
+
+class EnvironmentRollup(db.Model):
+    # Per-bucket aggregates of the raw readings at minute, hour and day resolution
+    resolution = db.Column(db.String(10), primary_key=True)
+    location = db.Column(db.String(100), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    temperature_sum = db.Column(db.Float, nullable=False, default=0)
+    temperature_min = db.Column(db.Float, nullable=False)
+    temperature_max = db.Column(db.Float, nullable=False)
+    humidity_sum = db.Column(db.Float, nullable=False, default=0)
+    humidity_min = db.Column(db.Float, nullable=False)
+    humidity_max = db.Column(db.Float, nullable=False)
+    wind_speed_sum = db.Column(db.Float, nullable=False, default=0)
+    wind_speed_min = db.Column(db.Float, nullable=False)
+    wind_speed_max = db.Column(db.Float, nullable=False)
+    visibility_sum = db.Column(db.Float, nullable=False, default=0)
+    visibility_min = db.Column(db.Float, nullable=False)
+    visibility_max = db.Column(db.Float, nullable=False)
+
+class AlertRule(db.Model):
+    # Threshold rule evaluated by the environment poller over recent readings
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    metric = db.Column(db.String(20), nullable=False)  # temperature, humidity, wind_speed or visibility
+    operator = db.Column(db.String(1), nullable=False)  # '>' or '<'
+    threshold = db.Column(db.Float, nullable=False)
+    clear_threshold = db.Column(db.Float, nullable=True)  # Defaults to threshold (no hysteresis)
+    duration = db.Column(db.Integer, nullable=False, default=0)  # Seconds the breach must last
+    location = db.Column(db.String(100), nullable=True)  # None applies to every polled location
+    message = db.Column(db.String(255), nullable=False)
+    enabled = db.Column(db.Boolean, nullable=False, default=True)
+
+class AlertState(db.Model):
+    # Outcome of the latest evaluation of each rule at each location
+    rule_id = db.Column(db.Integer, db.ForeignKey('alert_rule.id'), primary_key=True)
+    location = db.Column(db.String(100), primary_key=True)
+    active = db.Column(db.Boolean, nullable=False, default=False)
+    since = db.Column(db.DateTime, nullable=True)
+    value = db.Column(db.Float, nullable=True)
+    evaluated_at = db.Column(db.DateTime, nullable=False)
+
+class CargoStatusEvent(db.Model):
+    # Append-only history of cargo statuses, written with every status change. Keyed by
+    # tracking ID without a foreign key, so it outlives the cargo row.
+    id = db.Column(db.Integer, primary_key=True)
+    cargo_id = db.Column(db.Integer, nullable=False)
+    tracking_id = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    # Serves both the per-cargo history and the "status as of T" seek
+    __table_args__ = (db.Index('ix_cargo_status_event_tracking_id_changed_at', 'tracking_id', 'changed_at'),)
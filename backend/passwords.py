@@ -0,0 +1,108 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from flask import current_app
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing pool already has as much work queued as it accepts.
+    """
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password, pw_hash)
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def _mp_context():
+    # Not fork: the workers must not inherit the app's threads, locks and connections.
+    # Windows has no forkserver; spawn is its default anyway.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def hash_rounds(pw_hash):
+    """
+    Return the cost factor stored in a bcrypt hash such as '$2b$12$...', or None.
+    """
+    try:
+        return int(pw_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded process pool so login storms cannot pin the request threads.
+
+    At most PASSWORD_HASH_WORKERS hashes run at once and PASSWORD_HASH_QUEUE more may wait;
+    beyond that, callers wait up to PASSWORD_HASH_WAIT seconds for a slot and then get
+    PasswordHasherBusy. With PASSWORD_HASH_WORKERS set to 0, hashing runs inline.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def hash(self, password):
+        return self._run(_hash, password.encode('utf-8'), current_app.config['BCRYPT_LOG_ROUNDS'])
+
+    def check(self, pw_hash, password):
+        return self._run(_check, pw_hash.encode('utf-8'), password.encode('utf-8'))
+
+    def needs_rehash(self, pw_hash):
+        return hash_rounds(pw_hash) != current_app.config['BCRYPT_LOG_ROUNDS']
+
+    def _run(self, fn, *args):
+        config = current_app.config
+        if config['PASSWORD_HASH_WORKERS'] == 0:
+            return fn(*args)
+
+        executor = self._get_executor(config)
+        try:
+            return self._submit(executor, fn, args)
+        except BrokenProcessPool:
+            # A worker died, e.g. OOM-killed, which breaks the whole pool: replace it and retry once
+            self._discard(executor)
+            return self._submit(self._get_executor(config), fn, args)
+
+    def _get_executor(self, config):
+        with self._lock:
+            if self._executor is None:
+                workers = config['PASSWORD_HASH_WORKERS']
+                self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+                if self._slots is None:
+                    self._slots = threading.BoundedSemaphore(workers + config['PASSWORD_HASH_QUEUE'])
+            return self._executor
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor, fn, args):
+        config = current_app.config
+        if not self._slots.acquire(timeout=config['PASSWORD_HASH_WAIT']):
+            raise PasswordHasherBusy()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+password_hasher = PasswordHasher()
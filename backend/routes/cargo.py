@@ -1,10 +1,30 @@
-from flask import Blueprint, jsonify, request
+import csv
+import io
+import json
+import threading
+from collections import Counter
+from datetime import datetime
+from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required
 from flask_apispec import use_kwargs, marshal_with, doc
-from marshmallow import Schema, fields
-from models import Cargo
+from marshmallow import Schema, fields, validate, ValidationError
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+from models import Cargo, CargoStatusCount, CargoStatusEvent
 from app import db
-from utils import role_required
+from utils import (
+    role_required,
+    PaginationSchema,
+    FieldsetSchema,
+    paginate_keyset,
+    cursor_headers,
+    conditional_get,
+    bump_table_version,
+    increment_counter,
+    to_utc_naive,
+)
+from serialization import parse_fieldset, select_fields, fieldset_response
+from write_behind import WriteBehindBuffer, WriteBehindFull
 
 cargo_bp = Blueprint('cargo', __name__)
 
@@ -13,17 +33,92 @@ cargo_bp = Blueprint('cargo', __name__)
 # -------------------
 
 class CargoRequestSchema(Schema):
-    tracking_id = fields.Str(required=True, description="Unique tracking ID of the cargo")
-    status = fields.Str(required=True, description="Current status of the cargo")
+    tracking_id = fields.Str(required=True, validate=validate.Length(max=100), description="Unique tracking ID of the cargo")
+    status = fields.Str(required=True, validate=validate.Length(max=50), description="Current status of the cargo")
 
 class CargoUpdateSchema(Schema):
-    status = fields.Str(required=True, description="Updated status of the cargo")
+    status = fields.Str(required=True, validate=validate.Length(max=50), description="Updated status of the cargo")
 
 class CargoResponseSchema(Schema):
     id = fields.Int()
     tracking_id = fields.Str()
     status = fields.Str()
 
+class CargoListQuerySchema(PaginationSchema, FieldsetSchema):
+    pass
+
+class CargoLookupSchema(Schema):
+    tracking_ids = fields.List(
+        fields.Str(),
+        required=True,
+        validate=validate.Length(min=1),
+        description="Tracking IDs to look up (at most CARGO_LOOKUP_MAX_BATCH)",
+    )
+
+class CargoLookupResultSchema(Schema):
+    found = fields.List(fields.Nested(CargoResponseSchema), description="Cargo that exists, in request order")
+    missing = fields.List(fields.Str(), description="Tracking IDs with no matching cargo")
+
+class CargoStatsQuerySchema(Schema):
+    exact = fields.Bool(
+        missing=False,
+        description="Count with a GROUP BY over the cargo table instead of reading the maintained counters",
+    )
+
+class CargoStatsSchema(Schema):
+    counts = fields.Dict(keys=fields.Str(), values=fields.Int(), description="Number of cargo rows per status")
+    total = fields.Int(description="Total number of cargo rows")
+
+class CargoExportSchema(Schema):
+    format = fields.Str(
+        missing="ndjson",
+        validate=validate.OneOf(["ndjson", "csv"]),
+        description="Export format: 'ndjson' (default) or 'csv'",
+    )
+
+class CargoBulkRowErrorSchema(Schema):
+    index = fields.Int(description="Position of the row in the submitted batch")
+    tracking_id = fields.Str(description="Tracking ID of the rejected row, if it had one")
+    error = fields.Raw(description="Why the row was rejected")
+
+class CargoBulkResultSchema(Schema):
+    inserted = fields.Int(description="Number of cargo rows inserted")
+    conflicts = fields.List(fields.Nested(CargoBulkRowErrorSchema), description="Rows rejected for a duplicate tracking ID")
+    errors = fields.List(fields.Nested(CargoBulkRowErrorSchema), description="Rows rejected by validation")
+
+class CargoStatusUpdateResultSchema(Schema):
+    updated = fields.Int(description="Cargo whose status changed")
+    unchanged = fields.Int(description="Cargo that already had the requested status")
+    not_found = fields.List(fields.Str(), description="Tracking IDs with no matching cargo")
+    accepted = fields.Int(description="Updates queued for the write-behind buffer (202 responses)")
+    errors = fields.List(fields.Nested(CargoBulkRowErrorSchema), description="Rows rejected by validation")
+
+
+class CargoStatusEventSchema(Schema):
+    status = fields.Str(description="Status the cargo changed to")
+    changed_at = fields.DateTime(description="When the status was set (UTC)")
+
+class CargoHistorySchema(Schema):
+    tracking_id = fields.Str()
+    status = fields.Str(description="Current status, or 'deleted'")
+    events = fields.List(fields.Nested(CargoStatusEventSchema), description="Status changes, oldest first")
+
+class CargoStatusAsOfQuerySchema(Schema):
+    as_of = fields.DateTime(description="Point in time (UTC). Defaults to now")
+
+class CargoStatusAsOfSchema(Schema):
+    tracking_id = fields.Str()
+    status = fields.Str(description="Status of the cargo at `as_of`")
+    as_of = fields.DateTime(allow_none=True, description="Requested point in time, or null for the current status")
+
+
+# Rows fetched from the database per round trip while streaming an export
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ("id", "tracking_id", "status")
+
+# Status recorded in the history when a cargo is deleted
+DELETED_STATUS = "deleted"
+
 
 # -------------------
 # 1. Get Cargo by Tracking ID
@@ -31,15 +126,21 @@ class CargoResponseSchema(Schema):
 @cargo_bp.route('/<int:tracking_id>', methods=['GET'])
 @jwt_required()
 @doc(description="Retrieve specific cargo details by tracking ID.", tags=["Cargo"])
+@use_kwargs(FieldsetSchema, location="query")
 @marshal_with(CargoResponseSchema, code=200)
-def get_cargo(tracking_id):
+def get_cargo(tracking_id, field_names):
     """
     Retrieve specific cargo details by tracking ID.
     """
-    cargo = Cargo.query.filter_by(tracking_id=tracking_id).first()
+    try:
+        field_names = parse_fieldset(CargoResponseSchema, field_names)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    cargo = select_fields(Cargo, field_names).filter(Cargo.tracking_id == tracking_id).first()
     if not cargo:
         return {"error": "Cargo not found"}, 404
-    return cargo
+    return fieldset_response(cargo, CargoResponseSchema, field_names, many=False)
 
 
 # -------------------
@@ -57,6 +158,9 @@ def add_cargo(tracking_id, status):
     """
     new_cargo = Cargo(tracking_id=tracking_id, status=status)
     db.session.add(new_cargo)
+    db.session.flush()  # Assigns the ID the status event refers to
+    _record_status_changes([(new_cargo.id, tracking_id, None, status)])
+    bump_table_version('cargo')
     db.session.commit()
     return new_cargo, 201
 
@@ -73,11 +177,14 @@ def update_cargo(tracking_id, status):
     """
     Update the status of a cargo by tracking ID.
     """
-    cargo = Cargo.query.filter_by(tracking_id=tracking_id).first()
+    # Locked so a concurrent change cannot apply the same old status to the counters twice
+    cargo = Cargo.query.filter_by(tracking_id=tracking_id).with_for_update().first()
     if not cargo:
         return {"error": "Cargo not found"}, 404
 
+    _record_status_changes([(cargo.id, cargo.tracking_id, cargo.status, status)])
     cargo.status = status
+    bump_table_version('cargo')
     db.session.commit()
     return {"message": "Cargo status updated successfully!"}, 200
 
@@ -93,11 +200,14 @@ def delete_cargo(tracking_id):
     """
     Delete cargo by tracking ID.
     """
-    cargo = Cargo.query.filter_by(tracking_id=tracking_id).first()
+    cargo = Cargo.query.filter_by(tracking_id=tracking_id).with_for_update().first()
     if not cargo:
         return {"error": "Cargo not found"}, 404
 
+    # The history is kept, closed with a DELETED_STATUS event
+    _record_status_changes([(cargo.id, cargo.tracking_id, cargo.status, None)])
     db.session.delete(cargo)
+    bump_table_version('cargo')
     db.session.commit()
     return {"message": "Cargo deleted successfully!"}, 200
 
@@ -106,12 +216,451 @@ def delete_cargo(tracking_id):
 # -------------------
 @cargo_bp.route('/', methods=['GET'])
 @jwt_required()
-@doc(description="Retrieve a list of all cargo.", tags=["Cargo"])
+@conditional_get('cargo')
+@doc(description="Retrieve cargo, paginated by ID. The next page cursor is returned in the X-Next-Cursor header.", tags=["Cargo"])
+@use_kwargs(CargoListQuerySchema, location="query")
 @marshal_with(CargoResponseSchema(many=True), code=200)
-def get_all_cargo():
+def get_all_cargo(limit, after, field_names):
+    """
+    Retrieve a page of cargo.
+    """
+    try:
+        field_names = parse_fieldset(CargoResponseSchema, field_names)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    cargo_list, next_cursor = paginate_keyset(select_fields(Cargo, field_names), Cargo.id, limit, after)
+    return fieldset_response(cargo_list, CargoResponseSchema, field_names, headers=cursor_headers(next_cursor))
+
+
+# -------------------
+# 6. Export All Cargo
+# -------------------
+@cargo_bp.route('/export', methods=['GET'])
+@jwt_required()
+@doc(description="Stream every cargo row as NDJSON or CSV, for reconciliation with external systems.", tags=["Cargo"])
+@use_kwargs(CargoExportSchema, location="query")
+def export_cargo(format):
+    """
+    Stream every cargo row as NDJSON or CSV.
+    """
+    if format == "csv":
+        body, mimetype = _export_csv(_export_rows()), "text/csv"
+    else:
+        body, mimetype = _export_ndjson(_export_rows()), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=cargo.{format}"},
+    )
+
+
+def _export_rows():
+    """
+    Yield cargo rows in ID order, fetching EXPORT_BATCH_SIZE rows per round trip.
+    The query is only built once streaming starts, so it runs on the session of the
+    context pushed by stream_with_context and is released when that context ends.
+    """
+    yield from (
+        db.session.query(Cargo.id, Cargo.tracking_id, Cargo.status)
+        .order_by(Cargo.id)
+        .execution_options(stream_results=True)
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+
+
+def _export_ndjson(rows):
+    """
+    Yield NDJSON lines, one chunk per database batch.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(EXPORT_COLUMNS, row))))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def _export_csv(rows):
+    """
+    Yield a CSV header followed by one chunk of rows per database batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+# -------------------
+# 7. Bulk Add Cargo
+# -------------------
+@cargo_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required('editor')
+@doc(
+    description="Add many cargo rows at once from a JSON array or an NDJSON body (Content-Type: application/x-ndjson). "
+                "Rows are inserted in chunked transactions; duplicate tracking IDs are reported per row. Editors and above only.",
+    tags=["Cargo"],
+)
+@marshal_with(CargoBulkResultSchema, code=200)
+def add_cargo_bulk():
+    """
+    Add many cargo rows at once.
+    """
+    payload = _read_bulk_payload()
+    if payload is None:
+        return {"error": "Expected a JSON array or an NDJSON body of cargo objects"}, 400
+
+    schema = CargoRequestSchema()
+    rows, errors = [], []
+    for index, item in enumerate(payload):
+        try:
+            rows.append((index, schema.load(item)))
+        except ValidationError as e:
+            tracking_id = item.get("tracking_id") if isinstance(item, dict) else None
+            errors.append({"index": index, "tracking_id": tracking_id, "error": e.messages})
+
+    chunk_size = current_app.config['CARGO_BULK_CHUNK_SIZE']
+    inserted, conflicts = 0, []
+    for start in range(0, len(rows), chunk_size):
+        chunk_inserted, chunk_conflicts = _insert_cargo_chunk(rows[start:start + chunk_size])
+        inserted += chunk_inserted
+        conflicts.extend(chunk_conflicts)
+
+    return {"inserted": inserted, "conflicts": conflicts, "errors": errors}, 200
+
+
+def _read_bulk_payload():
+    """
+    Parse the request body as a JSON array or as NDJSON. Returns None if it is neither.
+    """
+    if request.mimetype in ("application/x-ndjson", "application/ndjson"):
+        try:
+            return [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            return None
+    payload = request.get_json(silent=True)
+    return payload if isinstance(payload, list) else None
+
+
+def _insert_cargo_chunk(chunk):
+    """
+    Insert one chunk of validated (index, row) pairs in a single transaction.
+    Rows whose tracking ID already exists, or repeats within the batch, are skipped and reported.
+    """
+    conflicts = []
+    for attempt in range(2):
+        tracking_ids = [row["tracking_id"] for _, row in chunk]
+        existing = {
+            tracking_id for (tracking_id,) in
+            db.session.query(Cargo.tracking_id).filter(Cargo.tracking_id.in_(tracking_ids))
+        }
+        seen, to_insert = set(), []
+        conflicts = []
+        for index, row in chunk:
+            tracking_id = row["tracking_id"]
+            if tracking_id in existing or tracking_id in seen:
+                conflicts.append({"index": index, "tracking_id": tracking_id, "error": "Duplicate tracking_id"})
+                continue
+            seen.add(tracking_id)
+            to_insert.append(row)
+
+        if not to_insert:
+            db.session.rollback()
+            return 0, conflicts
+        try:
+            db.session.execute(Cargo.__table__.insert(), to_insert)
+            ids = dict(
+                db.session.query(Cargo.tracking_id, Cargo.id)
+                .filter(Cargo.tracking_id.in_([row["tracking_id"] for row in to_insert]))
+            )
+            _record_status_changes([
+                (ids[row["tracking_id"]], row["tracking_id"], None, row["status"]) for row in to_insert
+            ])
+            bump_table_version('cargo')
+            db.session.commit()
+            return len(to_insert), conflicts
+        except IntegrityError:
+            # A concurrent writer inserted some of these tracking IDs after the check above;
+            # roll back and re-check once so they are reported as conflicts.
+            db.session.rollback()
+            if attempt:
+                raise
+
+
+# -------------------
+# 8. Cargo Status Statistics
+# -------------------
+@cargo_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@doc(description="Count cargo per status.", tags=["Cargo"])
+@use_kwargs(CargoStatsQuerySchema, location="query")
+@marshal_with(CargoStatsSchema, code=200)
+def get_cargo_stats(exact):
+    """
+    Count cargo per status.
+    """
+    if exact or not current_app.config['CARGO_STATUS_COUNTERS']:
+        rows = db.session.query(Cargo.status, db.func.count(Cargo.id)).group_by(Cargo.status)
+    else:
+        rows = db.session.query(CargoStatusCount.status, CargoStatusCount.count).filter(CargoStatusCount.count > 0)
+    counts = dict(rows.all())
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+
+# -------------------
+# 9. Look Up Many Cargo
+# -------------------
+@cargo_bp.route('/lookup', methods=['POST'])
+@jwt_required()
+@doc(description="Retrieve many cargo at once by tracking ID, reporting which IDs were not found.", tags=["Cargo"])
+@use_kwargs(CargoLookupSchema, location="json")
+@marshal_with(CargoLookupResultSchema, code=200)
+def lookup_cargo(tracking_ids):
+    """
+    Retrieve many cargo at once by tracking ID.
+    """
+    max_batch = current_app.config['CARGO_LOOKUP_MAX_BATCH']
+    if len(tracking_ids) > max_batch:
+        return {"error": f"At most {max_batch} tracking IDs can be looked up at once"}, 400
+
+    tracking_ids = list(dict.fromkeys(tracking_ids))
+    by_tracking_id = {
+        cargo.tracking_id: cargo
+        for cargo in Cargo.query.filter(Cargo.tracking_id.in_(tracking_ids))
+    }
+    return {
+        "found": [by_tracking_id[id] for id in tracking_ids if id in by_tracking_id],
+        "missing": [id for id in tracking_ids if id not in by_tracking_id],
+    }
+
+
+# -------------------
+# 10. Bulk Update Cargo Status
+# -------------------
+@cargo_bp.route('/status', methods=['PATCH'])
+@jwt_required()
+@role_required('editor')
+@doc(
+    description="Set the status of many cargo at once from a JSON array or an NDJSON body of {tracking_id, status} objects. "
+                "The last status given for a tracking ID wins. Each chunk is applied with one UPDATE. With "
+                "CARGO_STATUS_WRITE_BEHIND enabled the updates are queued and coalesced, and 202 is returned. Editors and above only.",
+    tags=["Cargo"],
+)
+@marshal_with(CargoStatusUpdateResultSchema, code=200)
+@marshal_with(CargoStatusUpdateResultSchema, code=202)
+def update_cargo_statuses():
+    """
+    Set the status of many cargo at once.
+    """
+    payload = _read_bulk_payload()
+    if payload is None:
+        return {"error": "Expected a JSON array or an NDJSON body of cargo objects"}, 400
+
+    schema = CargoRequestSchema()
+    updates, errors = {}, []
+    for index, item in enumerate(payload):
+        try:
+            row = schema.load(item)
+        except ValidationError as e:
+            tracking_id = item.get("tracking_id") if isinstance(item, dict) else None
+            errors.append({"index": index, "tracking_id": tracking_id, "error": e.messages})
+            continue
+        # Re-insert so the order follows the last update of each tracking ID
+        updates.pop(row["tracking_id"], None)
+        updates[row["tracking_id"]] = row["status"]
+
+    if current_app.config['CARGO_STATUS_WRITE_BEHIND']:
+        try:
+            _status_buffer().put(list(updates.items()))
+        except WriteBehindFull:
+            return {"error": "Too many pending status updates, please retry shortly"}, 503, {"Retry-After": "1"}
+        return {"accepted": len(updates), "errors": errors}, 202
+
+    updated, unchanged, not_found = _apply_status_updates(updates)
+    return {"updated": updated, "unchanged": unchanged, "not_found": not_found, "errors": errors}, 200
+
+
+_status_buffer_lock = threading.Lock()
+_status_buffer_instance = None
+
+
+def _status_buffer():
+    """
+    The process-wide write-behind buffer for status updates, created on first use.
+    """
+    global _status_buffer_instance
+    with _status_buffer_lock:
+        if _status_buffer_instance is None:
+            _status_buffer_instance = WriteBehindBuffer(
+                current_app._get_current_object(),
+                _apply_status_updates,
+                current_app.config['CARGO_STATUS_FLUSH_INTERVAL'],
+                current_app.config['CARGO_STATUS_BUFFER_MAX'],
+                current_app.config['CARGO_STATUS_FLUSH_ATTEMPTS'],
+                # The database is unreachable or locked, not rejecting the rows
+                transient_errors=(OperationalError, InterfaceError),
+            )
+        return _status_buffer_instance
+
+
+def _apply_status_updates(updates):
+    """
+    Apply a {tracking_id: status} mapping in chunked transactions.
+    Returns the number of updated and unchanged cargo, and the tracking IDs not found.
+    """
+    items = list(updates.items())
+    chunk_size = current_app.config['CARGO_BULK_CHUNK_SIZE']
+    updated, unchanged, not_found = 0, 0, []
+    for start in range(0, len(items), chunk_size):
+        chunk_updated, chunk_unchanged, chunk_not_found = _update_status_chunk(dict(items[start:start + chunk_size]))
+        updated += chunk_updated
+        unchanged += chunk_unchanged
+        not_found.extend(chunk_not_found)
+    return updated, unchanged, not_found
+
+
+def _update_status_chunk(updates):
+    """
+    Apply one chunk of {tracking_id: status} in a single transaction, with one
+    UPDATE ... SET status = CASE tracking_id ... for the rows that actually change.
+    """
+    current = {
+        tracking_id: (id, status) for tracking_id, id, status in
+        db.session.query(Cargo.tracking_id, Cargo.id, Cargo.status)
+        .filter(Cargo.tracking_id.in_(list(updates)))
+        .with_for_update()
+    }
+    changed = {
+        tracking_id: status for tracking_id, status in updates.items()
+        if tracking_id in current and current[tracking_id][1] != status
+    }
+    if changed:
+        cargo = Cargo.__table__
+        db.session.execute(
+            cargo.update()
+            .where(cargo.c.tracking_id.in_(list(changed)))
+            .values(status=case(changed, value=cargo.c.tracking_id))
+        )
+        _record_status_changes([
+            (current[tracking_id][0], tracking_id, current[tracking_id][1], status)
+            for tracking_id, status in changed.items()
+        ])
+        bump_table_version('cargo')
+    db.session.commit()
+    not_found = [tracking_id for tracking_id in updates if tracking_id not in current]
+    return len(changed), len(current) - len(changed), not_found
+
+def _record_status_changes(changes):
+    """
+    Record cargo status changes, inside the caller's transaction: append them to the status
+    history and apply them to the per-status counters. `changes` holds
+    (cargo_id, tracking_id, old_status, new_status) tuples; None stands for a created or
+    deleted cargo.
+    """
+    changed_at = datetime.utcnow()
+    events = [
+        {
+            "cargo_id": cargo_id,
+            "tracking_id": tracking_id,
+            "status": DELETED_STATUS if new_status is None else new_status,
+            "changed_at": changed_at,
+        }
+        for cargo_id, tracking_id, old_status, new_status in changes
+        if new_status != old_status
+    ]
+    if events:
+        db.session.execute(CargoStatusEvent.__table__.insert(), events)
+
+    if not current_app.config['CARGO_STATUS_COUNTERS']:
+        return
+    deltas = Counter()
+    for _, _, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status is not None:
+            deltas[old_status] -= 1
+        if new_status is not None:
+            deltas[new_status] += 1
+
+    # Sorted so concurrent transactions lock counter rows in the same order
+    for status, delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        increment_counter(CargoStatusCount, {'status': status}, 'count', delta)
+
+
+# -------------------
+# 11. Cargo Status History
+# -------------------
+@cargo_bp.route('/<tracking_id>/history', methods=['GET'])
+@jwt_required()
+@doc(description="List the status changes of a cargo, oldest first, paginated by event ID. The history of a deleted cargo is kept and ends with a 'deleted' event. The next page cursor is returned in the X-Next-Cursor header.", tags=["Cargo"])
+@use_kwargs(PaginationSchema, location="query")
+@marshal_with(CargoHistorySchema, code=200)
+def get_cargo_history(tracking_id, limit, after):
+    """
+    List the status changes of a cargo.
+    """
+    status = _current_status(tracking_id)
+    if status is None:
+        return {"error": "Cargo not found"}, 404
+
+    query = db.session.query(
+        CargoStatusEvent.id, CargoStatusEvent.status, CargoStatusEvent.changed_at
+    ).filter(CargoStatusEvent.tracking_id == tracking_id)
+    events, next_cursor = paginate_keyset(query, CargoStatusEvent.id, limit, after)
+    return {"tracking_id": tracking_id, "status": status, "events": events}, 200, cursor_headers(next_cursor)
+
+
+def _current_status(tracking_id):
+    """
+    Status of the cargo with this tracking ID, DELETED_STATUS if it was deleted, or None
+    if it never existed.
+    """
+    status = db.session.query(Cargo.status).filter(Cargo.tracking_id == tracking_id).scalar()
+    if status is not None:
+        return status
+    if db.session.query(CargoStatusEvent.query.filter_by(tracking_id=tracking_id).exists()).scalar():
+        return DELETED_STATUS
+    return None
+
+
+# -------------------
+# 12. Cargo Status As Of
+# -------------------
+@cargo_bp.route('/<tracking_id>/status', methods=['GET'])
+@jwt_required()
+@doc(description="Status of a cargo at a point in time, or its current status when as_of is omitted.", tags=["Cargo"])
+@use_kwargs(CargoStatusAsOfQuerySchema, location="query")
+@marshal_with(CargoStatusAsOfSchema, code=200)
+def get_cargo_status_as_of(tracking_id, as_of=None):
     """
-    Retrieve a list of all cargo.
+    Status of a cargo at a point in time.
     """
-    cargo_list = Cargo.query.all()
-    return cargo_list, 200
+    if as_of is None:
+        status = _current_status(tracking_id)
+        if status is None:
+            return {"error": "Cargo not found"}, 404
+        return {"tracking_id": tracking_id, "status": status, "as_of": None}
 
+    as_of = to_utc_naive(as_of)
+    # Latest event at or before as_of: one seek on (tracking_id, changed_at)
+    status = db.session.query(CargoStatusEvent.status).filter(
+        CargoStatusEvent.tracking_id == tracking_id,
+        CargoStatusEvent.changed_at <= as_of,
+    ).order_by(CargoStatusEvent.changed_at.desc(), CargoStatusEvent.id.desc()).limit(1).scalar()
+    if status is None:
+        return {"error": "Cargo has no recorded status at that time"}, 404
+    return {"tracking_id": tracking_id, "status": status, "as_of": as_of}
@@ -1,17 +1,22 @@
+from datetime import datetime, timedelta
+
 import requests
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 from flask_jwt_extended import jwt_required
-from flask_apispec import doc, marshal_with
-from marshmallow import Schema, fields
-from utils import role_required
+from flask_apispec import doc, marshal_with, use_kwargs
+from string import Formatter
+
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from models import AlertRule
+from app import db
+from utils import role_required, to_utc_naive
+from weather import weather_cache, WeatherAPIError, CircuitOpenError, LOCATION
+from environment_store import METRICS, RESOLUTIONS, history
+from alerts import OPERATORS, active_alerts, evaluate_reading, has_fresh_evaluation
 import logging
 
 environment_bp = Blueprint('environment', __name__)
 
-# Replace with your actual WeatherAPI key
-WEATHER_API_KEY = 'ef1d406aca01419e90d154339242912'
-BASE_URL = "https://api.weatherapi.com/v1"  # Fixed the URL
-
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 
@@ -28,40 +33,103 @@ class EnvironmentMetricsSchema(Schema):
 class EnvironmentalAlertsSchema(Schema):
     alerts = fields.List(fields.Str, description="List of environmental alerts")
 
+class ActiveAlertSchema(Schema):
+    rule_id = fields.Int()
+    name = fields.Str()
+    location = fields.Str()
+    metric = fields.Str()
+    value = fields.Float(description="Latest value of the metric")
+    since = fields.DateTime(description="When the alert was raised (UTC)")
+    evaluated_at = fields.DateTime(description="Time of the latest evaluation (UTC)")
+    message = fields.Str()
+
+class ActiveAlertsSchema(Schema):
+    alerts = fields.List(fields.Nested(ActiveAlertSchema))
+
+class AlertRuleSchema(Schema):
+    id = fields.Int(dump_only=True)
+    name = fields.Str(required=True, description="Name of the rule")
+    metric = fields.Str(required=True, validate=validate.OneOf(METRICS), description="Metric the rule watches")
+    operator = fields.Str(required=True, validate=validate.OneOf(list(OPERATORS)),
+                          description="'>' alerts above the threshold, '<' below it")
+    threshold = fields.Float(required=True, description="Value that raises the alert")
+    clear_threshold = fields.Float(allow_none=True, missing=None,
+                                   description="Value that clears a raised alert. Defaults to the threshold")
+    duration = fields.Int(missing=0, validate=validate.Range(min=0),
+                          description="Seconds the threshold must be breached before the alert is raised")
+    location = fields.Str(allow_none=True, missing=None, description="Polled location. Omit to apply to every location")
+    message = fields.Str(required=True, description="Alert text. May use the {value} and {location} placeholders")
+    enabled = fields.Bool(missing=True)
+
+    @validates_schema
+    def validate_rule(self, data, **kwargs):
+        clear_threshold = data.get('clear_threshold')
+        if clear_threshold is not None:
+            if data['operator'] == '>' and clear_threshold > data['threshold'] \
+                    or data['operator'] == '<' and clear_threshold < data['threshold']:
+                raise ValidationError("Must not be past the threshold.", 'clear_threshold')
+        for _, field_name, _, _ in Formatter().parse(data['message']):
+            if field_name is not None and field_name not in ('value', 'location'):
+                raise ValidationError("Only the {value} and {location} placeholders are allowed.", 'message')
+
+class AlertRuleListSchema(Schema):
+    rules = fields.List(fields.Nested(AlertRuleSchema))
+
+class EnvironmentHistoryQuerySchema(Schema):
+    start = fields.DateTime(data_key="from", description="Start of the range (UTC). Defaults to 24 hours before `to`")
+    end = fields.DateTime(data_key="to", description="End of the range (UTC), exclusive. Defaults to now")
+    resolution = fields.Str(missing="hour", validate=validate.OneOf(list(RESOLUTIONS)),
+                            description="Bucket size: minute, hour or day")
+    location = fields.Str(missing=LOCATION, description="Polled location")
+
+class EnvironmentHistoryPointSchema(Schema):
+    bucket_start = fields.DateTime(description="Start of the bucket (UTC)")
+    count = fields.Int(description="Number of readings in the bucket")
+    temperature_avg = fields.Float()
+    temperature_min = fields.Float()
+    temperature_max = fields.Float()
+    humidity_avg = fields.Float()
+    humidity_min = fields.Float()
+    humidity_max = fields.Float()
+    wind_speed_avg = fields.Float()
+    wind_speed_min = fields.Float()
+    wind_speed_max = fields.Float()
+    visibility_avg = fields.Float()
+    visibility_min = fields.Float()
+    visibility_max = fields.Float()
+
+class EnvironmentHistorySchema(Schema):
+    location = fields.Str()
+    resolution = fields.Str()
+    points = fields.List(fields.Nested(EnvironmentHistoryPointSchema))
+
+
+def alert_max_age():
+    """
+    Age past which an alert evaluation is stale: two polling intervals.
+    """
+    return timedelta(seconds=2 * current_app.config['ENVIRONMENT_POLL_INTERVAL'])
+
 
 # -------------------
 # 1. Get Environment Metrics
 # -------------------
 @environment_bp.route('/', methods=['GET'])
 @jwt_required()
-@doc(description="Provides data on environmental metrics using WeatherAPI.", tags=["Environment"])
+@doc(description="Provides data on environmental metrics using WeatherAPI. Readings are cached for WEATHER_CACHE_TTL seconds, and never served more than WEATHER_MAX_STALE seconds old; the Age header gives the age of the reading.", tags=["Environment"])
 @marshal_with(EnvironmentMetricsSchema, code=200)
 def get_environment_metrics():
     """
     Provides data on environmental metrics using WeatherAPI.
     """
     try:
-        response = requests.get(f"{BASE_URL}/current.json", params={
-            "key": WEATHER_API_KEY,
-            "q": "Port La Goulette"
-        }, timeout=10)  # Added timeout for the request
-
-        # Log the full response for debugging
-        logging.debug(f"Request URL: {response.url}")
-        logging.debug(f"Response Status: {response.status_code}")
-        logging.debug(f"Response Body: {response.text}")
-
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "temperature": data['current']['temp_c'],
-                "humidity": data['current']['humidity'],
-                "wind_speed": data['current']['wind_kph'],
-                "visibility": data['current']['vis_km']
-            }
-        else:
-            return {"error": f"Failed to fetch environmental data. Status Code: {response.status_code}"}, 500
+        conditions = weather_cache.get()
+        return conditions, 200, {"Age": str(int(weather_cache.age() or 0))}
 
+    except CircuitOpenError as e:
+        return {"error": str(e)}, 503
+    except WeatherAPIError as e:
+        return {"error": str(e)}, 500
     except requests.exceptions.RequestException as e:
         logging.error(f"Request to WeatherAPI failed: {e}")
         return {"error": "An error occurred while fetching environmental data."}, 500
@@ -73,41 +141,106 @@ def get_environment_metrics():
 @environment_bp.route('/alerts', methods=['GET'])
 @jwt_required()
 @role_required('admin')
-@doc(description="Fetches safety and environmental alerts based on weather conditions.", tags=["Environment"])
+@doc(description="Fetches safety and environmental alerts raised by the latest evaluation of the alert rules, or by the current conditions when no poller is running.", tags=["Environment"])
 @marshal_with(EnvironmentalAlertsSchema, code=200)
 def get_environmental_alerts():
     """
     Fetches safety and environmental alerts based on weather conditions.
     """
-    try:
-        response = requests.get(f"{BASE_URL}/current.json", params={
-            "key": WEATHER_API_KEY,
-            "q": "Port La Goulette"
-        }, timeout=10)  # Added timeout for the request
-
-        # Log the full response for debugging
-        logging.debug(f"Request URL: {response.url}")
-        logging.debug(f"Response Status: {response.status_code}")
-        logging.debug(f"Response Body: {response.text}")
-
-        if response.status_code == 200:
-            data = response.json()
-            alerts = []
-
-            # Generate alerts based on weather conditions
-            wind_speed = data['current']['wind_kph']
-            temperature = data['current']['temp_c']
-            if wind_speed > 50:
-                alerts.append(f"High wind speed: {wind_speed} kph")
-            if temperature > 40:
-                alerts.append("Heatwave warning")
-            if not alerts:
-                alerts.append("No significant weather alerts")
-
-            return {"alerts": alerts}
-        else:
-            return {"error": f"Failed to fetch environmental data. Status Code: {response.status_code}"}, 500
+    max_age = alert_max_age()
+    if has_fresh_evaluation(max_age):
+        alerts = [alert["message"] for alert in active_alerts(max_age)]
+    else:
+        # No poller is running: check the rules against the cached current conditions
+        try:
+            alerts = evaluate_reading(weather_cache.get(), LOCATION)
+        except CircuitOpenError as e:
+            return {"error": str(e)}, 503
+        except WeatherAPIError as e:
+            return {"error": str(e)}, 500
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Request to WeatherAPI failed: {e}")
+            return {"error": "An error occurred while fetching environmental data."}, 500
+    if not alerts:
+        alerts.append("No significant weather alerts")
+    return {"alerts": alerts}
 
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Request to WeatherAPI failed: {e}")
-        return {"error": "An error occurred while fetching environmental alerts."}, 500
+
+# -------------------
+# 3. Get Environment History
+# -------------------
+@environment_bp.route('/history', methods=['GET'])
+@jwt_required()
+@doc(description="Returns stored environmental readings aggregated per minute, hour or day, from the poller's rollups.", tags=["Environment"])
+@use_kwargs(EnvironmentHistoryQuerySchema, location="query")
+@marshal_with(EnvironmentHistorySchema, code=200)
+def get_environment_history(resolution, location, start=None, end=None):
+    """
+    Returns stored environmental readings aggregated per minute, hour or day.
+    """
+    end = to_utc_naive(end) or datetime.utcnow()
+    start = to_utc_naive(start) or end - timedelta(days=1)
+    if start >= end:
+        return {"error": "'from' must be before 'to'"}, 400
+
+    max_points = current_app.config['ENVIRONMENT_HISTORY_MAX_POINTS']
+    if (end - start) / RESOLUTIONS[resolution] > max_points:
+        return {"error": f"Range spans more than {max_points} {resolution} buckets; use a coarser resolution"}, 400
+
+    return {
+        "location": location,
+        "resolution": resolution,
+        "points": history(location, start, end, resolution),
+    }
+
+
+
+# -------------------
+# 4. Get Active Alerts
+# -------------------
+@environment_bp.route('/alerts/active', methods=['GET'])
+@jwt_required()
+@doc(description="Returns the alerts raised by the latest evaluation of the alert rules, oldest first.", tags=["Environment"])
+@marshal_with(ActiveAlertsSchema, code=200)
+def get_active_alerts():
+    """
+    Returns the alerts raised by the latest evaluation of the alert rules.
+    """
+    max_age = alert_max_age()
+    if not has_fresh_evaluation(max_age):
+        return {"error": "No recent evaluation of the alert rules; the environment poller may be down."}, 503
+    return {"alerts": active_alerts(max_age)}
+
+
+# -------------------
+# 5. List Alert Rules
+# -------------------
+@environment_bp.route('/rules', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+@doc(description="Lists the environmental alert rules. Admins only.", tags=["Environment"])
+@marshal_with(AlertRuleListSchema, code=200)
+def get_alert_rules():
+    """
+    Lists the environmental alert rules.
+    """
+    return {"rules": AlertRule.query.order_by(AlertRule.id).all()}
+
+
+# -------------------
+# 6. Add Alert Rule
+# -------------------
+@environment_bp.route('/rules', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+@doc(description="Adds an environmental alert rule, evaluated from the next poll on. Admins only.", tags=["Environment"])
+@use_kwargs(AlertRuleSchema, location="json")
+@marshal_with(AlertRuleSchema, code=201)
+def add_alert_rule(**rule):
+    """
+    Adds an environmental alert rule.
+    """
+    alert_rule = AlertRule(**rule)
+    db.session.add(alert_rule)
+    db.session.commit()
+    return alert_rule, 201
@@ -1,9 +1,18 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from flask_apispec import doc, use_kwargs, marshal_with
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 from app import db
-from utils import role_required
+from utils import (
+    role_required,
+    PaginationSchema,
+    FieldsetSchema,
+    paginate_keyset,
+    cursor_headers,
+    conditional_get,
+    bump_table_version,
+)
+from serialization import parse_fieldset, select_fields, fieldset_response
 from models import Resource  # Ensure this model exists in your project
 
 resources_bp = Blueprint('resources', __name__)
@@ -17,25 +26,41 @@ class ResourceResponseSchema(Schema):
     name = fields.Str(description="Name of the resource")
     is_allocated = fields.Bool(description="Whether the resource is currently allocated")
 
+class ResourceListQuerySchema(PaginationSchema, FieldsetSchema):
+    pass
+
 class ResourceAllocateSchema(Schema):
     resource_id = fields.Int(required=True, description="ID of the resource to allocate")
 
+class ResourceBatchSchema(Schema):
+    resource_ids = fields.List(
+        fields.Int(),
+        required=True,
+        validate=validate.Length(min=1),
+        description="IDs of the resources to allocate or release, all or nothing",
+    )
+
 
 # -------------------
 # 1. Get All Resources
 # -------------------
 @resources_bp.route('/', methods=['GET'])
 @jwt_required()
-@doc(description="Display available resources.", tags=["Resources"])
+@conditional_get('resource')
+@doc(description="Display available resources, paginated by ID. The next page cursor is returned in the X-Next-Cursor header.", tags=["Resources"])
+@use_kwargs(ResourceListQuerySchema, location="query")
 @marshal_with(ResourceResponseSchema(many=True), code=200)
-def get_resources():
+def get_resources(limit, after, field_names):
     """
     Display available resources.
     """
-    resources = Resource.query.all()
-    if not resources:
-        return []
-    return resources
+    try:
+        field_names = parse_fieldset(ResourceResponseSchema, field_names)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    resources, next_cursor = paginate_keyset(select_fields(Resource, field_names), Resource.id, limit, after)
+    return fieldset_response(resources, ResourceResponseSchema, field_names, headers=cursor_headers(next_cursor))
 
 
 # -------------------
@@ -50,14 +75,80 @@ def allocate_resource(resource_id):
     """
     Allocate a resource for an operation.
     """
-    # Fetch the resource by ID
-    resource = Resource.query.get(resource_id)
-    if not resource:
-        return {"error": "Resource not found"}, 404
+    # A single conditional UPDATE decides the winner when operators race for the same resource
+    allocated = (
+        Resource.query
+        .filter(Resource.id == resource_id, Resource.is_allocated.isnot(True))
+        .update({Resource.is_allocated: True}, synchronize_session=False)
+    )
+    if allocated:
+        bump_table_version('resource')
+    db.session.commit()
 
-    if resource.is_allocated:
+    name = db.session.query(Resource.name).filter_by(id=resource_id).scalar()
+    if name is None:
+        return {"error": "Resource not found"}, 404
+    if not allocated:
         return {"error": "Resource is already allocated"}, 400
+    return {"message": f"Resource '{name}' allocated successfully!"}, 200
 
-    resource.is_allocated = True
-    db.session.commit()
-    return {"message": f"Resource '{resource.name}' allocated successfully!"}, 200
+
+# -------------------
+# 3. Allocate Several Resources
+# -------------------
+@resources_bp.route('/allocate/batch', methods=['POST'])
+@jwt_required()
+@role_required('operator')
+@doc(description="Allocate several resources at once: either all of them are allocated or none is. Only 'operator' role users are allowed.", tags=["Resources"])
+@use_kwargs(ResourceBatchSchema, location="json")
+def allocate_resources(resource_ids):
+    """
+    Allocate several resources, all or nothing.
+    """
+    return _set_allocation(resource_ids, allocate=True)
+
+
+# -------------------
+# 4. Release Several Resources
+# -------------------
+@resources_bp.route('/release/batch', methods=['POST'])
+@jwt_required()
+@role_required('operator')
+@doc(description="Release several allocated resources at once: either all of them are released or none is. Only 'operator' role users are allowed.", tags=["Resources"])
+@use_kwargs(ResourceBatchSchema, location="json")
+def release_resources(resource_ids):
+    """
+    Release several resources, all or nothing.
+    """
+    return _set_allocation(resource_ids, allocate=False)
+
+
+def _set_allocation(resource_ids, allocate):
+    """
+    Flip `is_allocated` for every resource in one conditional UPDATE.
+    Commits only if every resource was in the expected state; otherwise rolls back and reports why.
+    """
+    resource_ids = sorted(set(resource_ids))
+    expected = Resource.is_allocated.isnot(True) if allocate else Resource.is_allocated.is_(True)
+    updated = (
+        Resource.query
+        .filter(Resource.id.in_(resource_ids), expected)
+        .update({Resource.is_allocated: allocate}, synchronize_session=False)
+    )
+    if updated == len(resource_ids):
+        bump_table_version('resource')
+        db.session.commit()
+        action = "allocated" if allocate else "released"
+        return {"message": f"{updated} resources {action} successfully!", "resource_ids": resource_ids}, 200
+
+    db.session.rollback()
+    found = {
+        id: bool(is_allocated) for id, is_allocated in
+        db.session.query(Resource.id, Resource.is_allocated).filter(Resource.id.in_(resource_ids))
+    }
+    missing = [id for id in resource_ids if id not in found]
+    if missing:
+        return {"error": "Resources not found", "resource_ids": missing}, 404
+    conflicting = [id for id in resource_ids if found[id] == allocate]
+    state = "already allocated" if allocate else "not allocated"
+    return {"error": f"Resources are {state}", "resource_ids": conflicting}, 400
@@ -2,9 +2,21 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from flask_apispec import use_kwargs, marshal_with, doc
 from marshmallow import Schema, fields
-from models import Service, ServiceRequest
+from sqlalchemy import or_
+from models import Service, ServiceRequest, Vessel
 from app import db
-from utils import role_required
+from utils import (
+    role_required,
+    PaginationSchema,
+    FieldsetSchema,
+    cursor_headers,
+    conditional_get,
+    to_utc_naive,
+    encode_time_cursor,
+    decode_time_cursor,
+)
+from catalog import service_catalog
+from serialization import fast_path_enabled, json_response, parse_fieldset, schema_fields
 
 services_bp = Blueprint('services', __name__)
 
@@ -17,6 +29,16 @@ class ServiceResponseSchema(Schema):
     name = fields.Str(description="Service name")
     description = fields.Str(description="Service description")
 
+class ServiceListQuerySchema(PaginationSchema, FieldsetSchema):
+    pass
+
+class ServiceCatalogStatsSchema(Schema):
+    hits = fields.Int(description="Reads served from memory")
+    misses = fields.Int(description="Reads that (re)loaded the catalog from the database")
+    invalidations = fields.Int(description="Times the cached catalog was dropped")
+    size = fields.Int(description="Number of cached services")
+    age_seconds = fields.Float(allow_none=True, description="Seconds since the catalog was loaded")
+
 class ServiceRequestSchema(Schema):
     vessel_id = fields.Int(required=True, description="ID of the vessel requesting the service")
     service_id = fields.Int(required=True, description="ID of the service being requested")
@@ -27,22 +49,48 @@ class ServiceRequestResponseSchema(Schema):
     service_id = fields.Int(description="ID of the requested service")
     status = fields.Str(description="Request status", default="Pending")
 
+class ServiceRequestListItemSchema(ServiceRequestResponseSchema):
+    service_name = fields.Str(description="Name of the requested service")
+    created_at = fields.DateTime(description="When the request was made (UTC)")
+
+class ServiceRequestQuerySchema(PaginationSchema):
+    vessel_id = fields.Int(description="Only requests made for this vessel")
+    service_id = fields.Int(description="Only requests for this service")
+    created_from = fields.DateTime(data_key="from", description="Only requests made at or after this time (UTC)")
+    created_to = fields.DateTime(data_key="to", description="Only requests made before this time (UTC)")
+    after = fields.Str(
+        missing=None,
+        allow_none=True,
+        description="Cursor: the X-Next-Cursor header of the previous page",
+    )
+
 
 # -------------------
 # 1. Get All Services
 # -------------------
 @services_bp.route('/', methods=['GET'])
 @jwt_required()
-@doc(description="Lists all available port services.", tags=["Services"])
+@conditional_get('service')
+@doc(description="Lists available port services, paginated by ID. The next page cursor is returned in the X-Next-Cursor header.", tags=["Services"])
+@use_kwargs(ServiceListQuerySchema, location="query")
 @marshal_with(ServiceResponseSchema(many=True), code=200)
-def get_services():
+def get_services(limit, after, field_names):
     """
-    Lists all available port services.
+    Lists available port services.
     """
-    services = Service.query.all()
-    if not services:
-        return []
-    return services
+    try:
+        field_names = parse_fieldset(ServiceResponseSchema, field_names)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    services, next_cursor = service_catalog.list(limit, after)
+    if field_names != schema_fields(ServiceResponseSchema):
+        # Served from memory, so only the output is narrowed; marshal_with skips the missing keys
+        services = [{name: service[name] for name in field_names} for service in services]
+    if fast_path_enabled():
+        # Catalog entries hold exactly the selected ServiceResponseSchema fields
+        return json_response(services, headers=cursor_headers(next_cursor))
+    return services, 200, cursor_headers(next_cursor)
 
 
 # -------------------
@@ -59,9 +107,10 @@ def add_service_request(vessel_id, service_id):
     Handles service requests for vessels.
     """
     # Validate service existence
-    service = Service.query.get(service_id)
-    if not service:
+    if not service_catalog.exists(service_id):
         return {"error": f"Service with ID {service_id} not found."}, 404
+    if db.session.get(Vessel, vessel_id) is None:
+        return {"error": f"Vessel with ID {vessel_id} not found."}, 404
 
     # Create and save the service request
     service_request = ServiceRequest(vessel_id=vessel_id, service_id=service_id)
@@ -69,3 +118,65 @@ def add_service_request(vessel_id, service_id):
     db.session.commit()
 
     return service_request, 201
+
+
+# -------------------
+# 3. Service Catalog Cache Statistics
+# -------------------
+@services_bp.route('/cache', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+@doc(description="Hit and miss counters of the in-process service catalog cache. Admins only.", tags=["Services"])
+@marshal_with(ServiceCatalogStatsSchema, code=200)
+def get_service_catalog_stats():
+    """
+    Hit and miss counters of the service catalog cache.
+    """
+    return service_catalog.stats()
+
+
+# -------------------
+# 4. List Service Requests
+# -------------------
+@services_bp.route('/requests', methods=['GET'])
+@jwt_required()
+@doc(description="Lists service requests, newest first, optionally for one vessel or service and within a time range. The next page cursor is returned in the X-Next-Cursor header.", tags=["Services"])
+@use_kwargs(ServiceRequestQuerySchema, location="query")
+@marshal_with(ServiceRequestListItemSchema(many=True), code=200)
+def get_service_requests(limit, after, vessel_id=None, service_id=None, created_from=None, created_to=None):
+    """
+    Lists service requests, newest first.
+    """
+    query = db.session.query(
+        ServiceRequest.id,
+        ServiceRequest.vessel_id,
+        ServiceRequest.service_id,
+        ServiceRequest.created_at,
+        Service.name.label('service_name'),
+    ).join(Service, Service.id == ServiceRequest.service_id)
+
+    if vessel_id is not None:
+        query = query.filter(ServiceRequest.vessel_id == vessel_id)
+    if service_id is not None:
+        query = query.filter(ServiceRequest.service_id == service_id)
+    if created_from is not None:
+        query = query.filter(ServiceRequest.created_at >= to_utc_naive(created_from))
+    if created_to is not None:
+        query = query.filter(ServiceRequest.created_at < to_utc_naive(created_to))
+    if after is not None:
+        try:
+            cursor_created_at, cursor_id = decode_time_cursor(after)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        # (created_at, id) < cursor, spelled out so every backend can seek the composite indexes
+        query = query.filter(
+            ServiceRequest.created_at <= cursor_created_at,
+            or_(ServiceRequest.created_at < cursor_created_at, ServiceRequest.id < cursor_id),
+        )
+
+    rows = query.order_by(ServiceRequest.created_at.desc(), ServiceRequest.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_time_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, 200, cursor_headers(next_cursor)
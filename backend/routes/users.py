@@ -1,13 +1,12 @@
 from flask import Blueprint, jsonify
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from flask_apispec import use_kwargs, marshal_with, doc
 from marshmallow import Schema, fields
 from models import User
 from app import db
-from utils import role_required
+from utils import role_required, invalidate_user_role
+from passwords import password_hasher, PasswordHasherBusy
 
-bcrypt = Bcrypt()
 users_bp = Blueprint('users', __name__)  # Blueprint for user routes
 
 # Schemas for request and response validation/documentation
@@ -44,7 +43,10 @@ def register(username, password, role):
     if User.query.filter_by(username=username).first():
         return {"error": "Username already exists"}, 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed_password = password_hasher.hash(password)
+    except PasswordHasherBusy:
+        return _busy_response()
     new_user = User(username=username, password=hashed_password, role=role)
     db.session.add(new_user)
     db.session.commit()
@@ -66,12 +68,24 @@ def login(username, password):
     Authenticate user and return a JWT token.
     """
     user = User.query.filter_by(username=username).first()
-    if not user or not bcrypt.check_password_hash(user.password, password):
-        return {"error": "Invalid username or password"}, 401
+    try:
+        if not user or not password_hasher.check(user.password, password):
+            return {"error": "Invalid username or password"}, 401
+
+        # Upgrade hashes made with a different work factor while the plain password is at hand
+        if password_hasher.needs_rehash(user.password):
+            user.password = password_hasher.hash(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return _busy_response()
 
     access_token = create_access_token(identity=str(user.id))
     return {"access_token": access_token}, 200
 
+def _busy_response():
+    return {"error": "Too many concurrent password checks, please retry shortly"}, 503, {"Retry-After": "1"}
+
+
 # -------------------
 # 3. Get User by ID (Admin Only)
 # -------------------
@@ -113,6 +127,7 @@ def delete_user(id):
 
     db.session.delete(user)
     db.session.commit()
+    invalidate_user_role(id)
     return {"message": "User deleted successfully!"}, 200
 
 
@@ -134,4 +149,5 @@ def update_user_role(id, role):
 
     user.role = role
     db.session.commit()
+    invalidate_user_role(id)
     return {"message": f"User role updated to '{role}' successfully!"}, 200
@@ -1,13 +1,27 @@
+from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from flask_apispec import use_kwargs, marshal_with, doc
-from marshmallow import Schema, fields
-from models import Vessel
+from marshmallow import Schema, fields, validate
+from models import Vessel, ServiceRequest
 from app import db
-from utils import role_required
+from utils import (
+    role_required,
+    PaginationSchema,
+    FieldsetSchema,
+    paginate_keyset,
+    cursor_headers,
+    conditional_get,
+    bump_table_version,
+    to_utc_naive,
+    MAX_PAGE_LIMIT,
+)
+from serialization import parse_fieldset, select_fields, fieldset_response
 
 vessels_bp = Blueprint('vessels', __name__)
 
+SCHEDULE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
 # -------------------
 # Marshmallow Schemas
 # -------------------
@@ -15,11 +29,63 @@ vessels_bp = Blueprint('vessels', __name__)
 class VesselRequestSchema(Schema):
     name = fields.Str(required=True, description="Name of the vessel")
     schedule = fields.Str(required=True, description="Schedule for the vessel (e.g., '2025-01-20 08:00')")
+    arrival_at = fields.DateTime(description="Arrival time (UTC). Parsed from the schedule when omitted")
+    departure_at = fields.DateTime(description="Departure time (UTC). Parsed from the schedule when omitted")
 
 class VesselResponseSchema(Schema):
     id = fields.Int()
     name = fields.Str()
     schedule = fields.Str()
+    arrival_at = fields.DateTime()
+    departure_at = fields.DateTime()
+
+class VesselQuerySchema(PaginationSchema, FieldsetSchema):
+    arrival_from = fields.DateTime(data_key="from", description="Only vessels arriving at or after this time (UTC)")
+    arrival_to = fields.DateTime(data_key="to", description="Only vessels arriving before this time (UTC)")
+
+# One year; far larger windows overflow the datetime range
+MAX_UPCOMING_HOURS = 24 * 366
+
+class UpcomingArrivalsSchema(Schema):
+    hours = fields.Float(
+        missing=6,
+        validate=validate.Range(min=0, min_inclusive=False, max=MAX_UPCOMING_HOURS),
+        description=f"Look-ahead window in hours (default: 6, at most {MAX_UPCOMING_HOURS})",
+    )
+    limit = fields.Int(
+        missing=100,
+        validate=validate.Range(min=1, max=MAX_PAGE_LIMIT),
+        description=f"Maximum number of vessels to return (1-{MAX_PAGE_LIMIT})",
+    )
+
+
+def _parse_time(value):
+    for fmt in SCHEDULE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_schedule(schedule):
+    """
+    Extract (arrival, departure) from a schedule such as '2025-01-20 08:00'
+    or '2025-01-20 08:00 - 2025-01-21 18:00'. Unparseable parts are None.
+    """
+    for separator in (" - ", " to "):
+        if separator in schedule:
+            arrival, departure = schedule.split(separator, 1)
+            return _parse_time(arrival), _parse_time(departure)
+    return _parse_time(schedule), None
+
+
+def _resolve_times(schedule, arrival_at, departure_at):
+    parsed_arrival, parsed_departure = parse_schedule(schedule)
+    return (
+        to_utc_naive(arrival_at) or parsed_arrival,
+        to_utc_naive(departure_at) or parsed_departure,
+    )
 
 
 # -------------------
@@ -27,14 +93,30 @@ class VesselResponseSchema(Schema):
 # -------------------
 @vessels_bp.route('/', methods=['GET'])
 @jwt_required()
-@doc(description="Retrieve all vessels.", tags=["Vessels"])
+@conditional_get('vessel')
+@doc(
+    description="Retrieve vessels, paginated by ID, optionally limited to an arrival time range (from/to). "
+                "The next page cursor is returned in the X-Next-Cursor header.",
+    tags=["Vessels"],
+)
+@use_kwargs(VesselQuerySchema, location="query")
 @marshal_with(VesselResponseSchema(many=True), code=200)
-def get_vessels():
+def get_vessels(limit, after, field_names, arrival_from=None, arrival_to=None):
     """
-    Get all vessels
+    Get vessels, one keyset page at a time
     """
-    vessels = Vessel.query.all()
-    return vessels
+    try:
+        field_names = parse_fieldset(VesselResponseSchema, field_names)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    query = select_fields(Vessel, field_names)
+    if arrival_from is not None:
+        query = query.filter(Vessel.arrival_at >= to_utc_naive(arrival_from))
+    if arrival_to is not None:
+        query = query.filter(Vessel.arrival_at < to_utc_naive(arrival_to))
+    vessels, next_cursor = paginate_keyset(query, Vessel.id, limit, after)
+    return fieldset_response(vessels, VesselResponseSchema, field_names, headers=cursor_headers(next_cursor))
 
 
 # -------------------
@@ -46,12 +128,14 @@ def get_vessels():
 @doc(description="Add a new vessel. Editors and above only.", tags=["Vessels"])
 @use_kwargs(VesselRequestSchema, location="json")
 @marshal_with(VesselResponseSchema, code=201)
-def add_vessel(name, schedule):
+def add_vessel(name, schedule, arrival_at=None, departure_at=None):
     """
     Add a new vessel
     """
-    new_vessel = Vessel(name=name, schedule=schedule)
+    arrival_at, departure_at = _resolve_times(schedule, arrival_at, departure_at)
+    new_vessel = Vessel(name=name, schedule=schedule, arrival_at=arrival_at, departure_at=departure_at)
     db.session.add(new_vessel)
+    bump_table_version('vessel')
     db.session.commit()
     return new_vessel, 201
 
@@ -64,7 +148,7 @@ def add_vessel(name, schedule):
 @role_required('editor')
 @doc(description="Update a vessel. Editors and above only.", tags=["Vessels"])
 @use_kwargs(VesselRequestSchema, location="json")
-def update_vessel(id, name, schedule):
+def update_vessel(id, name, schedule, arrival_at=None, departure_at=None):
     """
     Update vessel details
     """
@@ -74,6 +158,8 @@ def update_vessel(id, name, schedule):
 
     vessel.name = name
     vessel.schedule = schedule
+    vessel.arrival_at, vessel.departure_at = _resolve_times(schedule, arrival_at, departure_at)
+    bump_table_version('vessel')
     db.session.commit()
     return {"message": "Vessel updated successfully!"}, 200
 
@@ -84,7 +170,7 @@ def update_vessel(id, name, schedule):
 @vessels_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()
 @role_required('admin')
-@doc(description="Delete a vessel. Admins only.", tags=["Vessels"])
+@doc(description="Delete a vessel that has no service requests. Admins only.", tags=["Vessels"])
 def delete_vessel(id):
     """
     Delete a vessel
@@ -93,6 +179,35 @@ def delete_vessel(id):
     if not vessel:
         return {"error": "Vessel not found"}, 404
 
+    # Service requests are kept; the operator decides what happens to them first
+    requests = ServiceRequest.query.filter_by(vessel_id=id).count()
+    if requests:
+        return {"error": f"Vessel has {requests} service request(s); delete or reassign them first"}, 409
+
     db.session.delete(vessel)
+    bump_table_version('vessel')
     db.session.commit()
     return {"message": "Vessel deleted successfully!"}, 200
+
+
+# -------------------
+# 5. Upcoming Arrivals
+# -------------------
+@vessels_bp.route('/upcoming', methods=['GET'])
+@jwt_required()
+@doc(description="List vessels arriving within the next `hours` hours, soonest first.", tags=["Vessels"])
+@use_kwargs(UpcomingArrivalsSchema, location="query")
+@marshal_with(VesselResponseSchema(many=True), code=200)
+def get_upcoming_arrivals(hours, limit):
+    """
+    List upcoming vessel arrivals
+    """
+    now = datetime.utcnow()
+    vessels = (
+        Vessel.query
+        .filter(Vessel.arrival_at >= now, Vessel.arrival_at < now + timedelta(hours=hours))
+        .order_by(Vessel.arrival_at, Vessel.id)
+        .limit(limit)
+        .all()
+    )
+    return vessels
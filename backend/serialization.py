@@ -0,0 +1,110 @@
+import json
+from datetime import date
+from functools import lru_cache
+
+from flask import current_app, make_response
+from sqlalchemy.orm import load_only
+
+from app import db
+
+try:
+    import orjson
+except ImportError:  # Optional: the json module is used when orjson is not installed
+    orjson = None
+
+
+def fast_path_enabled():
+    return current_app.config['FAST_SERIALIZATION']
+
+
+def dumps(data):
+    """
+    Encode `data` as compact JSON with sorted keys, like jsonify does for marshalled output.
+    Naive datetimes are written in ISO 8601, as marshmallow's DateTime field does.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=_default).encode()
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def schema_fields(schema_cls):
+    """
+    Names of the fields a response schema dumps, in declaration order.
+    """
+    return tuple(schema_cls().fields)
+
+
+@lru_cache(maxsize=None)
+def narrowed_schema(schema_cls, field_names, many=False):
+    """
+    Instance of `schema_cls` restricted to `field_names`, built once per fieldset.
+    """
+    return schema_cls(only=field_names, many=many)
+
+
+def parse_fieldset(schema_cls, fields_param):
+    """
+    Field names selected by a comma-separated `fields=` parameter, in schema order.
+    Returns every field when the parameter is empty, and raises ValueError on unknown names.
+    """
+    available = schema_fields(schema_cls)
+    if not fields_param:
+        return available
+    requested = {name.strip() for name in fields_param.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(available)}")
+    return tuple(name for name in available if name in requested) or available
+
+
+def projected_query(model, field_names):
+    """
+    Query selecting only the columns named by `field_names`, returning plain rows instead
+    of ORM instances. The primary key is appended when missing so keyset pagination can
+    read its cursor; fieldset_response ignores it.
+    """
+    columns = [getattr(model, name) for name in field_names]
+    columns += [column for column in model.__table__.primary_key if column.key not in field_names]
+    return db.session.query(*columns)
+
+
+def select_fields(model, field_names):
+    """
+    Query for `model` loading only `field_names`: projected rows on the fast path,
+    otherwise ORM instances with the other columns deferred.
+    """
+    if fast_path_enabled():
+        return projected_query(model, field_names)
+    return model.query.options(load_only(*(getattr(model, name) for name in field_names)))
+
+
+def json_response(data, status=200, headers=None):
+    """
+    Response carrying `data` encoded with dumps(). marshal_with passes it through unchanged.
+    """
+    response = make_response(dumps(data), status, headers or {})
+    response.mimetype = "application/json"
+    return response
+
+
+def fieldset_response(result, schema_cls, field_names, many=True, headers=None):
+    """
+    Serialize what a select_fields query returned. Full fieldsets of ORM instances are left to
+    marshal_with; narrowed ones are dumped with a cached `only=` schema.
+    """
+    if fast_path_enabled():
+        if many:
+            data = [dict(zip(field_names, row)) for row in result]
+        else:
+            data = dict(zip(field_names, result))
+        return json_response(data, 200, headers)
+    if field_names == schema_fields(schema_cls):
+        return result, 200, headers
+    return json_response(narrowed_schema(schema_cls, field_names, many).dump(result), 200, headers)
@@ -1,7 +1,54 @@
-from flask import jsonify
+import base64
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from flask import jsonify, current_app, request, make_response
 from flask_jwt_extended import get_jwt_identity
 from functools import wraps
-from models import User
+from marshmallow import Schema, fields, validate
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models import User, TableVersion
+from app import db
+
+# In-process identity cache: user ID -> (role, cached_at).
+# Entries expire after ROLE_CACHE_TTL seconds and are dropped as soon as
+# a role is changed or a user deleted through this process.
+_role_cache = {}
+_role_cache_lock = threading.Lock()
+_role_cache_generation = 0
+
+
+def get_user_role(user_id):
+    """
+    Return the role of the given user, or None if the user does not exist.
+    """
+    global _role_cache_generation
+    key = str(user_id)
+    now = time.monotonic()
+    entry = _role_cache.get(key)
+    if entry is not None and now - entry[1] < current_app.config['ROLE_CACHE_TTL']:
+        return entry[0]
+
+    generation = _role_cache_generation
+    role = db.session.query(User.role).filter_by(id=user_id).scalar()
+    if role is not None:
+        with _role_cache_lock:
+            # Skip caching if an invalidation raced with the query above
+            if generation == _role_cache_generation:
+                _role_cache[key] = (role, now)
+    return role
+
+
+def invalidate_user_role(user_id):
+    """
+    Forget the cached role of a user. Call after changing or deleting the user.
+    """
+    global _role_cache_generation
+    with _role_cache_lock:
+        _role_cache_generation += 1
+        _role_cache.pop(str(user_id), None)
+
 
 def role_required(required_role):
     """
@@ -11,12 +58,150 @@ def role_required(required_role):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            if not user:
+            role = get_user_role(get_jwt_identity())
+            if role is None:
                 return jsonify({"error": "User not found"}), 404
-            if user.role != required_role:
+            if role != required_role:
                 return jsonify({"error": f"Access denied: Requires '{required_role}' role"}), 403
             return fn(*args, **kwargs)
         return decorator
     return wrapper
+
+
+# Keyset pagination limits shared by the list endpoints
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+class PaginationSchema(Schema):
+    limit = fields.Int(
+        missing=DEFAULT_PAGE_LIMIT,
+        validate=validate.Range(min=1, max=MAX_PAGE_LIMIT),
+        description=f"Maximum number of items to return (1-{MAX_PAGE_LIMIT})",
+    )
+    after = fields.Int(
+        missing=None,
+        allow_none=True,
+        description="Cursor: only return items with an ID greater than this value",
+    )
+
+
+class FieldsetSchema(Schema):
+    field_names = fields.Str(
+        data_key="fields",
+        missing=None,
+        description="Comma-separated response fields to return, e.g. fields=id,name. Defaults to all fields",
+    )
+
+
+def paginate_keyset(query, column, limit, after=None):
+    """
+    Fetch one page of `query` ordered by `column`, starting after the `after` cursor.
+    Returns the rows and the cursor of the next page (None on the last page).
+    """
+    if after is not None:
+        query = query.filter(column > after)
+    rows = query.order_by(column).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, getattr(rows[-1], column.key)
+
+
+def cursor_headers(next_cursor):
+    """
+    Response headers advertising the next page cursor, if any.
+    """
+    if next_cursor is None:
+        return {}
+    return {"X-Next-Cursor": str(next_cursor)}
+
+
+def encode_time_cursor(timestamp, id):
+    """
+    Opaque cursor for keyset pagination on (timestamp, id).
+    """
+    raw = f"{timestamp.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_time_cursor(cursor):
+    """
+    Inverse of encode_time_cursor. Raises ValueError on a malformed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def to_utc_naive(value):
+    """
+    Stored times are naive UTC; convert timezone-aware input to match.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def increment_counter(model, key, column, delta, session=None):
+    """
+    Add `delta` to `column` of the `model` row whose primary key is `key` (a {column: value}
+    dict), creating the row with `delta` if it does not exist, inside the transaction of
+    `session` (db.session by default). Runs as one upsert where the dialect has one, so
+    concurrent first writers cannot both insert.
+    """
+    session = session or db.session
+    table = model.__table__
+    values = dict(key, **{column: delta})
+    increment = {column: table.c[column] + delta}
+    dialect = session.get_bind(mapper=model.__mapper__).dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table).values(values).on_conflict_do_update(index_elements=list(key), set_=increment)
+    elif dialect in ('mysql', 'mariadb'):
+        statement = mysql.insert(table).values(values).on_duplicate_key_update(increment)
+    else:
+        where = [table.c[name] == value for name, value in key.items()]
+        if session.execute(table.update().where(*where).values(increment)).rowcount:
+            return
+        statement = table.insert().values(values)
+    session.execute(statement)
+
+
+def bump_table_version(*table_names, session=None):
+    """
+    Increment the version of each table, inside the transaction of `session` (db.session by
+    default). Call from every route that writes to a table served by a conditional list endpoint.
+    """
+    for table_name in sorted(set(table_names)):
+        increment_counter(TableVersion, {'table_name': table_name}, 'version', 1, session=session)
+
+
+def conditional_get(*table_names):
+    """
+    A decorator that tags responses with an ETag derived from the given tables' versions
+    and the query string, and answers a matching If-None-Match with 304 without calling the view.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            versions = dict(
+                db.session.query(TableVersion.table_name, TableVersion.version)
+                .filter(TableVersion.table_name.in_(table_names))
+            )
+            key = ",".join(f"{name}:{versions.get(name, 0)}" for name in table_names)
+            etag = hashlib.sha1(f"{key}?{request.query_string.decode()}".encode()).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            return response
+        return decorator
+    return wrapper
@@ -0,0 +1,286 @@
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import WEATHER_API_LATENCY
+
+# Replace with your actual WeatherAPI key
+WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', 'ef1d406aca01419e90d154339242912')
+BASE_URL = os.getenv('WEATHER_API_BASE_URL', "https://api.weatherapi.com/v1")
+LOCATION = os.getenv('WEATHER_LOCATION', "Port La Goulette")
+
+# Seconds a reading is considered fresh before it is refreshed in the background
+WEATHER_CACHE_TTL = float(os.getenv('WEATHER_CACHE_TTL', 60))
+# Seconds after which a reading that could not be refreshed is no longer served (0: no limit)
+WEATHER_MAX_STALE = float(os.getenv('WEATHER_MAX_STALE', 600))
+
+# Upstream connection handling
+WEATHER_CONNECT_TIMEOUT = float(os.getenv('WEATHER_CONNECT_TIMEOUT', 3.05))
+WEATHER_READ_TIMEOUT = float(os.getenv('WEATHER_READ_TIMEOUT', 5))
+WEATHER_POOL_SIZE = int(os.getenv('WEATHER_POOL_SIZE', 10))
+WEATHER_MAX_RETRIES = int(os.getenv('WEATHER_MAX_RETRIES', 1))
+# Retries may add at most this fraction of extra load on top of first attempts
+WEATHER_RETRY_BUDGET_RATIO = float(os.getenv('WEATHER_RETRY_BUDGET_RATIO', 0.2))
+# Consecutive failures that open the circuit, and seconds before a recovery probe
+WEATHER_BREAKER_FAILURES = int(os.getenv('WEATHER_BREAKER_FAILURES', 5))
+WEATHER_BREAKER_RESET = float(os.getenv('WEATHER_BREAKER_RESET', 30))
+
+
+class WeatherAPIError(Exception):
+    """
+    Raised when WeatherAPI answers with a non-200 status.
+    """
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(WeatherAPIError):
+    """
+    Raised without calling WeatherAPI while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive failures. Once `reset_timeout`
+    seconds have passed, a single probe call is let through: success closes the
+    circuit, failure opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning("WeatherAPI circuit breaker opened")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Token bucket that earns `ratio` of a token per first attempt and spends one per retry,
+    so retries cannot multiply the load on an upstream that is already failing.
+    """
+    def __init__(self, ratio, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+
+    def record_attempt(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def _make_session():
+    # Keep-alive connections to WeatherAPI, shared by every worker thread
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WEATHER_POOL_SIZE, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _make_session()
+breaker = CircuitBreaker(WEATHER_BREAKER_FAILURES, WEATHER_BREAKER_RESET)
+retry_budget = RetryBudget(WEATHER_RETRY_BUDGET_RATIO)
+
+
+def _request_current(location):
+    start = time.perf_counter()
+    try:
+        response = session.get(f"{BASE_URL}/current.json", params={
+            "key": WEATHER_API_KEY,
+            "q": location
+        }, timeout=(WEATHER_CONNECT_TIMEOUT, WEATHER_READ_TIMEOUT))
+    except requests.exceptions.RequestException:
+        WEATHER_API_LATENCY.observe(("error",), time.perf_counter() - start)
+        raise
+    WEATHER_API_LATENCY.observe((str(response.status_code),), time.perf_counter() - start)
+
+    # Log the full response for debugging
+    logging.debug(f"Request URL: {response.url}")
+    logging.debug(f"Response Status: {response.status_code}")
+    logging.debug(f"Response Body: {response.text}")
+
+    if response.status_code != 200:
+        raise WeatherAPIError(
+            f"Failed to fetch environmental data. Status Code: {response.status_code}",
+            response.status_code,
+        )
+
+    try:
+        current = response.json()['current']
+        return {
+            "temperature": current['temp_c'],
+            "humidity": current['humidity'],
+            "wind_speed": current['wind_kph'],
+            "visibility": current['vis_km']
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        # A malformed 200 is an upstream fault, like a bad gateway
+        raise WeatherAPIError(f"Unexpected response from WeatherAPI: {e!r}", 502)
+
+
+def fetch_current_conditions(location=LOCATION):
+    """
+    Fetch the current conditions for `location` from WeatherAPI.
+
+    Connection errors, timeouts, 5xx answers and malformed bodies are retried up to
+    WEATHER_MAX_RETRIES times while the retry budget allows, and count towards opening
+    the circuit breaker.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("WeatherAPI is unavailable; not retrying until the circuit breaker resets.")
+    retry_budget.record_attempt()
+
+    attempt = 0
+    while True:
+        try:
+            conditions = _request_current(location)
+        except (requests.exceptions.RequestException, WeatherAPIError) as e:
+            upstream_failure = not isinstance(e, WeatherAPIError) or e.status_code >= 500
+            if upstream_failure and attempt < WEATHER_MAX_RETRIES and retry_budget.try_spend():
+                attempt += 1
+                time.sleep(random.uniform(0.05, 0.2))
+                continue
+            if upstream_failure:
+                breaker.record_failure()
+            else:
+                # A 4xx means WeatherAPI itself is reachable and answering
+                breaker.record_success()
+            raise
+        except Exception:
+            # Anything unexpected still settles the breaker, or a half-open probe never ends
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return conditions
+
+
+class _Flight:
+    """
+    One in-progress loader call that other callers can wait on.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SnapshotCache:
+    """
+    Caches the result of a zero-argument loader for `ttl` seconds.
+
+    Concurrent misses share a single loader call. Once a value has been loaded,
+    an expired entry keeps being served while one background thread refreshes it, for
+    up to `max_stale` seconds after it was loaded (0 for no limit). Past that, reads wait
+    for a fresh value as on a miss, and get the loader's error if it fails.
+    """
+    def __init__(self, loader, ttl, max_stale=0):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None
+        self._inflight = None
+
+    def get(self):
+        with self._lock:
+            age = self._age()
+            if age is not None and (not self.max_stale or age < self.max_stale):
+                if age >= self.ttl and self._inflight is None:
+                    self._inflight = _Flight()
+                    threading.Thread(target=self._load, args=(self._inflight,), daemon=True).start()
+                return self._value
+            leader = self._inflight is None
+            if leader:
+                self._inflight = _Flight()
+            flight = self._inflight
+        if leader:
+            self._load(flight)
+        return flight.result()
+
+    def put(self, value):
+        """
+        Store a value loaded elsewhere, e.g. by the environment poller, as a fresh entry.
+        """
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._loaded_at = None
+
+    def age(self):
+        """
+        Seconds since the cached value was loaded, or None if there is none.
+        """
+        with self._lock:
+            return self._age()
+
+    def _age(self):
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def _load(self, flight):
+        try:
+            flight.value = self._loader()
+        except Exception as e:
+            logging.error(f"Refreshing cached value failed: {e}")
+            flight.error = e
+        with self._lock:
+            if flight.error is None:
+                self._value = flight.value
+                self._loaded_at = time.monotonic()
+            self._inflight = None
+        flight.done.set()
+
+
+# Shared by every endpoint that needs the current conditions at the port
+weather_cache = SnapshotCache(fetch_current_conditions, WEATHER_CACHE_TTL, WEATHER_MAX_STALE)
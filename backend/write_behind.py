@@ -0,0 +1,111 @@
+import atexit
+import logging
+import threading
+
+
+class WriteBehindFull(Exception):
+    """
+    Raised when the buffer already holds as many pending keys as it accepts.
+    """
+
+
+class WriteBehindBuffer:
+    """
+    Collects keyed writes and hands them to `flush` in batches every `interval` seconds.
+    A key written again before the next flush only keeps its latest value, so bursts of
+    updates to the same row cost one write.
+
+    `flush` receives a {key: value} dict and runs in an application context on the
+    background thread. If it raises one of `transient_errors` (e.g. the database is down),
+    the batch is merged back under any newer values and retried on the next tick. Any other
+    error splits the batch in halves until the keys `flush` rejects are isolated; the rest is
+    written, and a rejected key is dropped once it has failed `max_attempts` flushes.
+    """
+    def __init__(self, app, flush, interval, max_pending, max_attempts=5, transient_errors=()):
+        self.app = app
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.transient_errors = transient_errors
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._failures = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def put(self, items):
+        """
+        Queue (key, value) pairs. Raises WriteBehindFull without queueing any of them if
+        the new keys would exceed max_pending.
+        """
+        with self._lock:
+            new_keys = {key for key, _ in items if key not in self._pending}
+            if len(self._pending) + len(new_keys) > self.max_pending:
+                raise WriteBehindFull()
+            for key, value in items:
+                self._pending[key] = value
+                # A new value gets a fresh set of attempts
+                self._failures.pop(key, None)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """
+        Write everything queued so far. Returns the number of keys written.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        retry, rejected = self._write(batch)
+        written = len(batch) - len(retry) - len(rejected)
+        with self._lock:
+            for key, error in rejected.items():
+                failures = self._failures.get(key, 0) + 1
+                if failures >= self.max_attempts:
+                    logging.error(f"Write-behind dropped {key!r} after {failures} failed flushes: {error}")
+                    self._failures.pop(key, None)
+                else:
+                    self._failures[key] = failures
+                    retry[key] = batch[key]
+            for key in batch.keys() - retry.keys():
+                self._failures.pop(key, None)
+            for key, value in retry.items():
+                self._pending.setdefault(key, value)
+        return written
+
+    def _write(self, batch):
+        """
+        Flush `batch`, bisecting it on non-transient errors. Returns the keys to retry
+        as they are and the keys rejected on their own, with their error.
+        """
+        try:
+            with self.app.app_context():
+                self._flush(batch)
+            return {}, {}
+        except self.transient_errors as e:
+            logging.error(f"Write-behind flush of {len(batch)} keys failed, will retry: {e}")
+            return dict(batch), {}
+        except Exception as e:
+            if len(batch) == 1:
+                return {}, {key: e for key in batch}
+        items = list(batch.items())
+        retry, rejected = self._write(dict(items[:len(items) // 2]))
+        more_retry, more_rejected = self._write(dict(items[len(items) // 2:]))
+        retry.update(more_retry)
+        rejected.update(more_rejected)
+        return retry, rejected
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()